@@ -1,36 +1,16 @@
 import streamlit as st
-import requests
-import json
-from docx import Document
-from io import BytesIO
+from diccionario import datos
+from diccionario.colecciones import ColeccionAutores
+from diccionario.concurrencia import ejecutar_en_paralelo
+from diccionario.indice import obtener_indice
+from diccionario.interfaz import aplicacion_glosario, boton_descarga, elegir_termino, enviar_trabajo, mostrar_progreso, panel_depuracion, pedir_termino, recoger_trabajo
 
 # Configuración de la página
 st.set_page_config(page_title="Diccionario Económico de la Escuela Austríaca", page_icon="📚", layout="wide")
 
 # Función para crear la columna de información
 def crear_columna_info():
-    st.markdown("""
-    ## Sobre esta aplicación
-
-    Esta aplicación es un Diccionario Económico basado en el pensamiento de la Escuela Austríaca de Economía. Permite a los usuarios obtener definiciones de términos económicos según la interpretación de diversos autores de esta escuela.
-
-    ### Cómo usar la aplicación:
-
-    1. Elija un término económico de la lista predefinida o proponga su propio término.
-    2. Seleccione uno o más autores de la Escuela Austríaca de Economía.
-    3. Haga clic en "Obtener definición" para generar las definiciones.
-    4. Lea las definiciones y fuentes proporcionadas.
-    5. Si lo desea, descargue un documento DOCX con toda la información.
-
-    ### Autor y actualización:
-    **Moris Polanco**, 26 ag 2024
-
-    ### Cómo citar esta aplicación (formato APA):
-    Polanco, M. (2024). *Diccionario Económico de la Escuela Austríaca* [Aplicación web]. https://dicaustriaca.streamlit.app
-
-    ---
-    **Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en información disponible en línea. Siempre verifique la información con fuentes académicas para un análisis más profundo.
-    """)
+    st.markdown(datos.INFO_AUTORES)
 
 # Título de la aplicación
 st.title("Diccionario Económico de la Escuela Austríaca")
@@ -47,98 +27,143 @@ with col2:
     # Acceder a las claves de API de los secretos de Streamlit
     TOGETHER_API_KEY = st.secrets["TOGETHER_API_KEY"]
     SERPER_API_KEY = st.secrets["SERPER_API_KEY"]
-
-    # Lista de términos económicos
-    terminos_economicos = [
-        "Acción humana", "Agio", "Apalancamiento", "Armonía de intereses", "Banca libre", "Beneficio económico", 
-        "Bienes de capital", "Bienes de consumo", "Bimetalismo", "Capital humano", "Capitalismo", "Catalaxia", 
-        "Cálculo económico", "Competencia perfecta", "Conocimiento disperso", "Costos de oportunidad", 
-        "Crítica del socialismo", "Curva de preferencia temporal", "Desajuste del mercado", "Desempleo natural", 
-        "Destrucción creativa", "Dilema del prisionero", "División del trabajo", "Doble contingencia", 
-        "Economía del bienestar", "Economía subjetiva", "Eficiencia de Pareto", "Eficiencia dinámica", 
-        "Empresario", "Equilibrio económico", "Equilibrio general", "Escuela Austríaca", "Escuela de Viena", 
-        "Estructura del capital", "Ëxternalidades", "Falacia del costo hundido", "Función empresarial", "Ganancia empresarial", 
-        "Heterogeneidad del capital", "Horizonte temporal", "Imposición fiscal", "Incentivos económicos", 
-        "Inflación", "Interés", "Intervencionismo", "Inversión de capital", "Ley de la oferta y la demanda", 
-        "Ley de los rendimientos decrecientes", "Ley de Say", "Libertad económica", "Libertarismo", 
-        "Margen de ganancia", "Margen de utilidad", "Método praxeológico", "Método subjetivo", "Moneda fiduciaria", 
-        "Moneda sana", "Monopolio natural", "Niveles de intervención", "Óptimo de Pareto", "Orden espontáneo", 
-        "Preferencia por la liquidez", "Preferencia temporal", "Precio de equilibrio", "Precios relativos", 
-        "Problema del cálculo económico", "Proceso de mercado", "Propiedad común", "Propiedad privada", 
-        "Racionalidad limitada", "Reducción de riesgos", "Rentabilidad", "Restricción presupuestaria", 
-        "Riesgo moral", "Rutas del mercado", "Salario real", "Selección adversa", "Señales de precios", 
-        "Sistema de precios", "Sociedad abierta", "Subjetivismo", "Subproducción", "Substitución", 
-        "Tasa de interés natural", "Teoría de la eficiencia", "Teoría del capital", "Teoría del ciclo económico", 
-        "Teoría del valor", "Teoría del valor subjetivo", "Teoría del valor y precio", "Título de propiedad", 
-        "Tragedia de los comunes", "Utilidad", "Utilidad marginal", "Valor de cambio", "Valor de uso", "Valor esperado", 
-        "Valor trabajo", "Ventaja comparativa", "Voluntarismo", "Vulnerabilidad económica"
-    ]
-
-    # Lista de autores de la Escuela Austríaca de Economía
-    autores_austriacos = [
-        "Ludwig von Mises", "Friedrich Hayek", "Carl Menger", "Eugen von Böhm-Bawerk", "Murray Rothbard", 
-        "Israel Kirzner", "Hans-Hermann Hoppe", "Joseph Schumpeter", "Ludwig Lachmann", "Walter Block"
-    ]
-
-    def buscar_informacion(query, autor):
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": f"{query} {autor} Escuela Austríaca de Economía"
-        })
-        headers = {
-            'X-API-KEY': SERPER_API_KEY,
-            'Content-Type': 'application/json'
-        }
-        response = requests.request("POST", url, headers=headers, data=payload)
-        return response.json()
-
-    def generar_definicion(termino, autor, contexto):
-        url = "https://api.together.xyz/inference"
-        payload = json.dumps({
-            "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-            "prompt": f"Contexto: {contexto}\n\nTérmino: {termino}\nAutor: {autor}\n\nProporciona una definición del término económico '{termino}' según el pensamiento de {autor}, un autor de la Escuela Austríaca de Economía. La definición debe ser concisa pero informativa, similar a una entrada de diccionario. Si es posible, incluye una referencia a una obra específica de {autor} que trate este concepto.\n\nDefinición:",
-            "max_tokens": 2048,
-            "temperature": 0,
-            "top_p": 0.7,
-            "top_k": 50,
-            "repetition_penalty": 0,
-            "stop": ["Término:"]
-        })
-        headers = {
-            'Authorization': f'Bearer {TOGETHER_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-        response = requests.request("POST", url, headers=headers, data=payload)
-        return response.json()['output']['choices'][0]['text'].strip()
-
-    def create_docx(termino, definiciones, fuentes):
-        doc = Document()
+    # Proveedor de respaldo opcional y percentil de latencia a partir del cual se cubre la búsqueda (0 = sólo failover)
+    SERPLY_API_KEY = st.secrets.get("SERPLY_API_KEY")
+    PERCENTIL_COBERTURA = float(st.secrets.get("PERCENTIL_COBERTURA", 95))
+    # Número máximo de autores que se procesan simultáneamente
+    MAX_CONCURRENCIA = int(st.secrets.get("MAX_CONCURRENCIA", 5))
+    # Colección del índice precalculado con las entradas término × autor
+    COLECCION = ColeccionAutores.COLECCION
+
+    # Listas de términos y autores (diccionario/datos.py)
+    terminos_economicos = datos.TERMINOS_AUTORES
+    autores_austriacos = datos.AUTORES_AUSTRIACOS
+
+    # Misma búsqueda y generación que generar_diccionario.py --coleccion autores
+    lote = ColeccionAutores(SERPER_API_KEY, TOGETHER_API_KEY, SERPLY_API_KEY, PERCENTIL_COBERTURA)
+    buscador, llm, generar_definicion = lote.buscador, lote.llm, lote.generar_definicion
+
+    # Escribe la entrada en `doc`, un escritor de cualquier formato de diccionario.exportadores
+    def escribir_documento(doc, termino, definiciones, fuentes):
         doc.add_heading('Diccionario Económico - Escuela Austríaca', 0)
 
-        doc.add_heading('Término', level=1)
-        doc.add_paragraph(termino)
+        def disponer(doc):
+            doc.add_heading('Término', level=1)
+            doc.add_paragraph(termino)
 
-        for autor, definicion in definiciones.items():
-            doc.add_heading(f'Definición según {autor}', level=2)
-            doc.add_paragraph(definicion)
+            for autor, definicion in definiciones.items():
+                doc.add_heading(f'Definición según {autor}', level=2)
+                doc.add_paragraph(definicion)
 
-        doc.add_heading('Fuentes', level=1)
-        for fuente in fuentes:
-            doc.add_paragraph(fuente, style='List Bullet')
+            doc.add_heading('Fuentes', level=1)
+            for fuente in fuentes:
+                doc.add_paragraph(fuente, style='List Bullet')
+
+        doc.add_entry({"termino": termino, "definiciones": definiciones, "fuentes": fuentes}, disponer)
 
         doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
 
-        return doc
+    # Trabajo en segundo plano: entradas del índice, búsquedas y definiciones de
+    # los autores seleccionados. Devuelve (termino, definiciones, fuentes).
+    def obtener_definiciones(trabajo, termino, predefinido, autores_seleccionados):
+        # Las entradas que ya están en el índice (p. ej. las precalculadas) se sirven sin llamar a las APIs
+        indice = obtener_indice()
+        entradas = {autor: indice.obtener(COLECCION, termino, autor) for autor in autores_seleccionados}
+        pendientes = [autor for autor in autores_seleccionados if not entradas[autor]]
+        procesados = []
+        trabajo.informar(0, len(pendientes), "Buscando información...")
+
+        def procesar_autor(autor):
+            resultado = busquedas[autor]
+            fuentes = resultado.fuentes
+
+            # Generar definición
+            definicion = generar_definicion(termino, autor, resultado.contexto(termino))
+            if definicion and predefinido:
+                indice.guardar(COLECCION, termino, definicion, fuentes, autor)
+            procesados.append(autor)
+            trabajo.informar(len(procesados), len(pendientes), f"Definición según {autor} generada")
+            return definicion, fuentes
+
+        # Buscar información relevante para todos los autores pendientes en una sola solicitud
+        busquedas = dict(zip(pendientes, buscador.buscar_lote([(termino, autor) for autor in pendientes]))) if pendientes else {}
+        # Cada autor se procesa en paralelo; el orden de la selección se conserva
+        generadas = dict(zip(pendientes, ejecutar_en_paralelo(procesar_autor, pendientes, MAX_CONCURRENCIA)))
+
+        definiciones = {}
+        autores_por_fuente = {}
+        for autor in autores_seleccionados:
+            entrada = entradas[autor]
+            if entrada:
+                definicion, fuentes = entrada["definicion"], entrada["fuentes"]
+            else:
+                definicion, fuentes = generadas[autor]
+            definiciones[autor] = definicion
+            for fuente in fuentes:
+                autores = autores_por_fuente.setdefault(fuente, [])
+                if autor not in autores:
+                    autores.append(autor)
+
+        # Cada enlace aparece una sola vez, junto a los autores cuya búsqueda lo devolvió
+        todas_fuentes = [f"{fuente} ({', '.join(autores)})" for fuente, autores in autores_por_fuente.items()]
+        return termino, definiciones, todas_fuentes
+
+    # Modo glosario: varios términos para los autores seleccionados; las
+    # instrucciones comunes se envían una vez por grupo de pares término × autor
+    INSTRUCCIONES_GLOSARIO = "Eres un redactor de un diccionario económico de la Escuela Austríaca de Economía. Para cada par de término y autor, proporciona una definición del término económico según el pensamiento de ese autor, concisa pero informativa, similar a una entrada de diccionario. Si es posible, incluye una referencia a una obra específica del autor que trate ese concepto."
+
+    def generar_entrada_glosario(par, contexto):
+        return {"definicion": generar_definicion(*par, contexto)}
+
+    # Entradas [((termino, autor), entrada, fuentes)] del glosario agrupadas por
+    # término: {termino: ({autor: definicion}, fuentes)}. Cada enlace aparece una
+    # sola vez por término, junto a los autores cuya búsqueda lo devolvió.
+    def agrupar_glosario(entradas):
+        glosario = {}
+        for (termino, autor), entrada, fuentes in entradas:
+            definiciones, autores_por_fuente = glosario.setdefault(termino, ({}, {}))
+            definiciones[autor] = entrada["definicion"]
+            for fuente in fuentes:
+                autores = autores_por_fuente.setdefault(fuente, [])
+                if autor not in autores:
+                    autores.append(autor)
+        return {
+            termino: (definiciones, [f"{fuente} ({', '.join(autores)})" for fuente, autores in autores_por_fuente.items()])
+            for termino, (definiciones, autores_por_fuente) in glosario.items()
+        }
+
+    def mostrar_glosario(entradas):
+        for termino, (definiciones, _) in agrupar_glosario(entradas).items():
+            st.subheader(termino)
+            for autor, definicion in definiciones.items():
+                st.markdown(f"**{autor}:** {definicion}")
 
-    # Interfaz de usuario
-    st.write("Elige un término económico de la lista o propón tu propio término:")
+    # Escribe el glosario en `doc` con las definiciones de cada autor y las fuentes de cada término
+    def escribir_glosario(doc, entradas):
+        doc.add_heading('Diccionario Económico - Escuela Austríaca', 0)
 
-    opcion = st.radio("", ["Elegir de la lista", "Proponer mi propio término"])
+        def disponer(doc, termino, definiciones, fuentes):
+            doc.add_heading(termino, level=1)
+            for autor, definicion in definiciones.items():
+                doc.add_heading(f'Definición según {autor}', level=2)
+                doc.add_paragraph(definicion)
+            if fuentes:
+                doc.add_heading('Fuentes', level=2)
+                for fuente in fuentes:
+                    doc.add_paragraph(fuente, style='List Bullet')
 
-    if opcion == "Elegir de la lista":
-        termino = st.selectbox("Selecciona un término:", terminos_economicos)
-    else:
-        termino = st.text_input("Ingresa tu propio término económico:")
+        for termino, (definiciones, fuentes) in agrupar_glosario(entradas).items():
+            doc.add_entry({"termino": termino, "definiciones": definiciones, "fuentes": fuentes},
+                          lambda doc: disponer(doc, termino, definiciones, fuentes))
+
+        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
+
+    # Interfaz de usuario
+    modo = st.radio("Modo:", ["Un término", "Varios términos (glosario)"], horizontal=True)
+    modo_glosario = modo == "Varios términos (glosario)"
+    if not modo_glosario:
+        st.write("Elige un término económico de la lista o propón tu propio término:")
+        termino, predefinido, sugerir_similares = elegir_termino(terminos_economicos)
 
     # Selección de autores
     st.write("Selecciona uno o más autores de la Escuela Austríaca de Economía (máximo 5):")
@@ -146,40 +171,39 @@ with col2:
 
     if len(autores_seleccionados) > 5:
         st.warning("Has seleccionado más de 5 autores. Por favor, selecciona un máximo de 5.")
+    elif modo_glosario:
+        aplicacion_glosario(
+            terminos_economicos, COLECCION, buscador, llm, INSTRUCCIONES_GLOSARIO,
+            {"definicion": "definición del término según el autor"}, generar_entrada_glosario, mostrar_glosario, escribir_glosario,
+            autores=autores_seleccionados, max_concurrencia=MAX_CONCURRENCIA
+        )
     else:
-        if st.button("Obtener definición"):
-            if termino and autores_seleccionados:
-                with st.spinner("Buscando información y generando definiciones..."):
-                    definiciones = {}
-                    todas_fuentes = []
-
-                    for autor in autores_seleccionados:
-                        # Buscar información relevante
-                        resultados_busqueda = buscar_informacion(termino, autor)
-                        contexto = "\n".join([item["snippet"] for item in resultados_busqueda.get("organic", [])])
-                        fuentes = [item["link"] for item in resultados_busqueda.get("organic", [])]
-
-                        # Generar definición
-                        definicion = generar_definicion(termino, autor, contexto)
-
-                        definiciones[autor] = definicion
-                        todas_fuentes.extend(fuentes)
-
-                    # Mostrar las definiciones
-                    st.subheader(f"Definiciones para el término: {termino}")
-                    for autor, definicion in definiciones.items():
-                        st.markdown(f"**{autor}:** {definicion}")
-
-                    # Botón para descargar el documento
-                    doc = create_docx(termino, definiciones, todas_fuentes)
-                    buffer = BytesIO()
-                    doc.save(buffer)
-                    buffer.seek(0)
-                    st.download_button(
-                        label="Descargar definición en DOCX",
-                        data=buffer,
-                        file_name=f"Definicion_{termino.replace(' ', '_')}.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
+        pedido = pedir_termino("Obtener definición", COLECCION, termino, predefinido, sugerir_similares, autores_seleccionados,
+                               completo=bool(termino and autores_seleccionados), aviso="Por favor, selecciona un término y al menos un autor.")
+        if pedido:
+            # La generación sigue en segundo plano aunque haya reruns o se recargue la página
+            enviar_trabajo("trabajo_definiciones", obtener_definiciones, *pedido, autores_seleccionados, descripcion=pedido[0])
+
+        trabajo = recoger_trabajo("trabajo_definiciones", mostrar_progreso)
+        if trabajo is not None:
+            if trabajo.error is not None:
+                st.error(str(trabajo.error))
             else:
-                st.warning("Por favor, selecciona un término y al menos un autor.")
+                termino_generado, definiciones, todas_fuentes = trabajo.resultado
+
+                # La entrada se conserva entre reruns (p. ej. al pulsar el botón de descarga)
+                st.session_state["ultima_entrada"] = (termino_generado, definiciones, todas_fuentes)
+
+        if "ultima_entrada" in st.session_state:
+            termino_mostrado, definiciones, todas_fuentes = st.session_state["ultima_entrada"]
+
+            # Mostrar las definiciones
+            st.subheader(f"Definiciones para el término: {termino_mostrado}")
+            for autor, definicion in definiciones.items():
+                st.markdown(f"**{autor}:** {definicion}")
+
+            # Botón para descargar el documento
+            boton_descarga("Descargar definición", f"Definicion_{termino_mostrado}", escribir_documento, termino_mostrado, definiciones, todas_fuentes)
+
+# Panel de depuración (oculto salvo con ?depuracion=1)
+panel_depuracion()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from servidores_simulados import ServidorSimulado, agregar_argumentos, configuracion_desde_argumentos
+
+# Benchmark sin conexión de los flujos de las aplicaciones contra los
+# servidores simulados de Serper, Serply y Together. Cada flujo se ejecuta en
+# un proceso nuevo (benchmarks/flujos.py) con una caché y un índice vacíos, y
+# se informa de la latencia por iteración (p50/p95/p99), el rendimiento, el
+# pico de RSS, las solicitudes recibidas por cada proveedor (incluidas las 429)
+# y el tiempo acumulado por etapa según diccionario.metricas.
+#
+#   python benchmarks/carga.py termino autores --iteraciones 30
+#   python benchmarks/carga.py lote --tasa-429-together 0.05 --json resultados.json
+#   python benchmarks/carga.py termino glosario --terminos 10
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLUJOS = ("termino", "autores", "lote", "glosario")
+
+
+# Percentil por rango más cercano
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return float("nan")
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados) + 0.5)) - 1))]
+
+
+def ejecutar_flujo(flujo, servidor, args):
+    directorio = tempfile.mkdtemp(prefix=f"carga_{flujo}_")
+    entorno = {
+        **os.environ,
+        **servidor.variables_entorno(),
+        "DICCIONARIO_CACHE": os.path.join(directorio, "cache.sqlite"),
+        "DICCIONARIO_INDICE": os.path.join(directorio, "indice.sqlite"),
+    }
+    iteraciones = args.iteraciones_lote if flujo == "lote" else args.iteraciones
+    comando = [
+        sys.executable, os.path.join(RAIZ, "benchmarks", "flujos.py"), flujo,
+        "--iteraciones", str(iteraciones), "--autores", str(args.autores),
+        "--workers", str(args.workers), "--terminos", str(args.terminos),
+    ]
+    if args.rps:
+        comando += ["--rps", str(args.rps)]
+    if args.respaldo:
+        comando.append("--respaldo")
+    salida = subprocess.run(comando, cwd=RAIZ, env=entorno, capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(f"El flujo {flujo} falló:\n{salida.stderr}")
+    resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+    resultado["solicitudes"] = servidor.contadores(reiniciar=True)
+    return resultado
+
+
+def resumir(resultado):
+    latencias = [iteracion["segundos"] for iteracion in resultado["iteraciones"]]
+    unidades = sum(iteracion["unidades"] for iteracion in resultado["iteraciones"])
+    return {
+        "flujo": resultado["flujo"],
+        "iteraciones": len(latencias),
+        "con_errores": sum(1 for iteracion in resultado["iteraciones"] if iteracion["errores"]),
+        "p50": percentil(latencias, 50),
+        "p95": percentil(latencias, 95),
+        "p99": percentil(latencias, 99),
+        "maximo": max(latencias, default=float("nan")),
+        "iteraciones_por_s": len(latencias) / sum(latencias) if latencias else 0.0,
+        "unidades_por_s": unidades / sum(latencias) if latencias else 0.0,
+        "rss_maximo_mib": resultado["rss_maximo_kib"] / 1024,
+    }
+
+
+def imprimir(resultados):
+    print(f"{'flujo':<8} {'n':>4} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'máx s':>8} {'it/s':>7} {'uds/s':>7} {'RSS MiB':>8}")
+    for resultado in resultados:
+        r = resumir(resultado)
+        print(f"{r['flujo']:<8} {r['iteraciones']:>4} {r['con_errores']:>4} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} "
+              f"{r['maximo']:>8.3f} {r['iteraciones_por_s']:>7.2f} {r['unidades_por_s']:>7.2f} {r['rss_maximo_mib']:>8.1f}")
+
+    for resultado in resultados:
+        solicitudes = ", ".join(
+            f"{proveedor} {' '.join(f'{estado}×{cuenta}' for estado, cuenta in sorted(estados.items()))}"
+            for proveedor, estados in sorted(resultado["solicitudes"].items())
+        )
+        print(f"\n[{resultado['flujo']}] solicitudes: {solicitudes or 'ninguna'}")
+        # Las etapas con más tiempo acumulado señalan el cuello de botella
+        for etapa in sorted(resultado["etapas"], key=lambda fila: -fila["total_s"])[:8]:
+            etiquetas = ", ".join(f"{clave}={valor}" for clave, valor in etapa.items()
+                                  if clave not in ("métrica", "llamadas", "total_s", "media_s", "máximo_s", "modelo"))
+            print(f"  {etapa['métrica']:<22} {etiquetas:<28} {etapa['llamadas']:>5} llamadas  "
+                  f"{etapa['total_s']:>9.3f} s  media {etapa['media_s']:.3f} s")
+        # Valores al terminar, p. ej. el límite de concurrencia al que llegó cada proveedor
+        for indicador in resultado.get("indicadores", []):
+            etiquetas = ", ".join(f"{clave}={valor}" for clave, valor in indicador.items() if clave not in ("métrica", "valor"))
+            print(f"  {indicador['métrica']:<22} {etiquetas:<28} {indicador['valor']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los flujos de las aplicaciones con proveedores simulados.")
+    parser.add_argument("flujos", nargs="*", choices=FLUJOS, default=list(FLUJOS), help="flujos a medir (por defecto, todos)")
+    parser.add_argument("--iteraciones", type=int, default=20, help="iteraciones de los flujos termino y autores")
+    parser.add_argument("--iteraciones-lote", type=int, default=1, help="ejecuciones completas del lote")
+    parser.add_argument("--autores", type=int, default=5, help="autores por término en el flujo autores")
+    parser.add_argument("--terminos", type=int, default=10, help="términos por iteración en el flujo glosario")
+    parser.add_argument("--rps", type=float, help="cuota fija por proveedor en el lote (por defecto, concurrencia adaptativa)")
+    parser.add_argument("--workers", type=int, default=16, help="hilos de cada etapa del lote")
+    parser.add_argument("--respaldo", action="store_true", help="configurar también el proveedor de búsqueda de respaldo")
+    parser.add_argument("--json", help="guardar los resultados completos en este archivo")
+    agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with ServidorSimulado(configuracion_desde_argumentos(args)) as servidor:
+        for flujo in args.flujos:
+            print(f"Midiendo {flujo}...", file=sys.stderr, flush=True)
+            resultados.append(ejecutar_flujo(flujo, servidor, args))
+
+    imprimir(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump([{**resultado, "resumen": resumir(resultado)} for resultado in resultados], archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Recorre una de las aplicaciones de Streamlit sin navegador (streamlit.testing)
+# y escribe en stdout una línea JSON con la latencia de cada iteración, el
+# pico de memoria (RSS) del proceso y las métricas por etapa. La lanza
+# benchmarks/carga.py en un proceso nuevo por flujo, con las URL de los
+# proveedores apuntando a los servidores simulados y una caché vacía.
+#
+#   termino  serply.py: un término de la lista por iteración (streaming)
+#   autores  app.py: un término por iteración con --autores autores en paralelo
+#   lote     serplyall.py: el lote completo de términos sin reanudar
+#   glosario serply.py en modo glosario: --terminos términos de la lista por iteración
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+TIEMPO_MAXIMO = 3600
+
+
+def _aplicacion(script, secretos):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(RAIZ, script), default_timeout=TIEMPO_MAXIMO)
+    for clave, valor in secretos.items():
+        at.secrets[clave] = valor
+    at.run()
+    return at
+
+
+def _elemento(elementos, etiqueta):
+    return next(elemento for elemento in elementos if elemento.label == etiqueta)
+
+
+# Devuelve los segundos hasta que termina el rerun y los errores que mostró la
+# aplicación (p. ej. cuando los reintentos no bastan ante respuestas 429)
+def _pulsar(at, etiqueta):
+    inicio = time.perf_counter()
+    _elemento(at.button, etiqueta).click().run()
+    segundos = time.perf_counter() - inicio
+    errores = [str(e.value) for e in at.exception] + [e.value for e in at.error]
+    errores += [w.value for w in at.warning if "fallaron" in w.value]
+    return segundos, errores
+
+
+# Cada flujo produce (segundos, errores, unidades) por iteración; las unidades
+# son los términos (o términos × autores) procesados en la iteración.
+def flujo_termino(args, secretos):
+    from diccionario import datos
+
+    at = _aplicacion("serply.py", secretos)
+    terminos = datos.TERMINOS_ESCUELA_AUSTRIACA
+    for i in range(args.iteraciones):
+        _elemento(at.selectbox, "Selecciona un término:").select(terminos[i % len(terminos)])
+        yield *_pulsar(at, "Generar entrada de diccionario"), 1
+
+
+def flujo_autores(args, secretos):
+    from diccionario import datos
+
+    at = _aplicacion("app.py", {**secretos, "MAX_CONCURRENCIA": args.autores})
+    _elemento(at.multiselect, "Autores").set_value(datos.AUTORES_AUSTRIACOS[:args.autores])
+    terminos = datos.TERMINOS_AUTORES
+    for i in range(args.iteraciones):
+        _elemento(at.selectbox, "Selecciona un término:").select(terminos[i % len(terminos)])
+        yield *_pulsar(at, "Obtener definición"), args.autores
+
+
+def flujo_lote(args, secretos):
+    from diccionario import datos
+
+    directorio = tempfile.mkdtemp(prefix="lote_")
+    at = _aplicacion("serplyall.py", {
+        **secretos,
+        **({"SERPLY_RPS": args.rps, "TOGETHER_RPS": args.rps} if args.rps else {}),
+        "WORKERS_BUSQUEDA": args.workers, "WORKERS_GENERACION": args.workers,
+        "DIARIO_LOTE": os.path.join(directorio, "diario.jsonl"),
+        "DOCX_LOTE": os.path.join(directorio, "lote.docx"),
+    })
+    _elemento(at.checkbox, "Reanudar desde el último punto de control").uncheck()
+    for _ in range(args.iteraciones):
+        yield *_pulsar(at, "Generar todas las entradas en batch"), len(datos.TERMINOS_EXTENDIDOS)
+
+
+def flujo_glosario(args, secretos):
+    from diccionario import datos
+
+    at = _aplicacion("serply.py", secretos)
+    _elemento(at.radio, "Modo:").set_value("Varios términos (glosario)").run()
+    terminos = datos.TERMINOS_ESCUELA_AUSTRIACA
+    for i in range(args.iteraciones):
+        seleccion = [terminos[(i * args.terminos + j) % len(terminos)] for j in range(args.terminos)]
+        _elemento(at.multiselect, "Términos de la lista:").set_value(seleccion)
+        yield *_pulsar(at, "Generar glosario"), args.terminos
+
+
+FLUJOS = {"termino": flujo_termino, "autores": flujo_autores, "lote": flujo_lote, "glosario": flujo_glosario}
+
+# Proveedor de búsqueda de cada flujo; con --respaldo se configura también el otro
+BUSQUEDA = {"termino": "SERPLY_API_KEY", "autores": "SERPER_API_KEY", "lote": "SERPLY_API_KEY", "glosario": "SERPLY_API_KEY"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta un flujo de las aplicaciones sin navegador.")
+    parser.add_argument("flujo", choices=list(FLUJOS))
+    parser.add_argument("--iteraciones", type=int, default=20)
+    parser.add_argument("--autores", type=int, default=5)
+    parser.add_argument("--terminos", type=int, default=10)
+    parser.add_argument("--rps", type=float)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--respaldo", action="store_true")
+    args = parser.parse_args(argv)
+
+    from diccionario import metricas
+
+    claves = ["SERPER_API_KEY", "SERPLY_API_KEY"] if args.respaldo else [BUSQUEDA[args.flujo]]
+    secretos = {clave: "simulada" for clave in ["TOGETHER_API_KEY", *claves]}
+    iteraciones = []
+    inicio = time.perf_counter()
+    for segundos, errores, unidades in FLUJOS[args.flujo](args, secretos):
+        iteraciones.append({"segundos": segundos, "errores": errores, "unidades": unidades})
+    total = time.perf_counter() - inicio
+
+    print(json.dumps({
+        "flujo": args.flujo,
+        "iteraciones": iteraciones,
+        "total_segundos": total,
+        # ru_maxrss está en KiB en Linux
+        "rss_maximo_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "etapas": [fila for fila in metricas.METRICAS.resumen() if "total_s" in fila],
+        "indicadores": [fila for fila in metricas.METRICAS.resumen() if "valor" in fila],
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# Servidores HTTP locales (uno por proveedor, en puertos consecutivos) que
+# imitan a google.serper.dev, api.serply.io y api.together.xyz para medir las aplicaciones sin claves ni red. Para cada
+# proveedor se configuran la distribución de latencia, la proporción de
+# respuestas 429 (con Retry-After), la capacidad (solicitudes simultáneas a
+# partir de las cuales responde 429) y el tamaño de las respuestas. Las
+# aplicaciones se dirigen a él con las variables de entorno que devuelve
+# `variables_entorno()`.
+#
+#   python benchmarks/servidores_simulados.py --puerto 8099 --latencia-together lognormal:0.8:0.4
+#   DICCIONARIO_URL_SERPLY=... DICCIONARIO_URL_TOGETHER=... streamlit run serply.py
+
+PROVEEDORES = ("serper", "serply", "together")
+
+
+# Distribución de latencia en segundos a partir de una especificación:
+#   "0.2" o "fija:0.2", "uniforme:0.1:0.5", "lognormal:MEDIANA:SIGMA", "exponencial:MEDIA"
+def distribucion(especificacion):
+    tipo, _, argumentos = especificacion.partition(":")
+    if not argumentos:
+        tipo, argumentos = "fija", tipo
+    valores = [float(valor) for valor in argumentos.split(":")]
+    if tipo == "fija":
+        return lambda: valores[0]
+    if tipo == "uniforme":
+        return lambda: random.uniform(valores[0], valores[1])
+    if tipo == "lognormal":
+        return lambda: random.lognormvariate(math.log(valores[0]), valores[1])
+    if tipo == "exponencial":
+        return lambda: random.expovariate(1 / valores[0])
+    raise ValueError(f"Distribución de latencia desconocida: {especificacion}")
+
+
+class ConfiguracionProveedor:
+    def __init__(self, latencia="0.1", tasa_429=0.0, capacidad=0, retry_after=1, resultados=10, longitud_fragmento=200,
+                 tokens=300, intervalo_token=0.0):
+        self.latencia = distribucion(latencia)
+        self.tasa_429 = tasa_429
+        # Con `capacidad` > 0, las solicitudes que superan ese número en curso reciben 429
+        self.capacidad = capacidad
+        self.retry_after = retry_after
+        # Resultados por búsqueda y caracteres por fragmento (Serper y Serply)
+        self.resultados = resultados
+        self.longitud_fragmento = longitud_fragmento
+        # Tokens por completado y segundos entre tokens en streaming (Together)
+        self.tokens = tokens
+        self.intervalo_token = intervalo_token
+
+
+def _texto(semilla, longitud):
+    palabras = ("precio", "mercado", "capital", "interés", "acción", "valor", "tiempo", "orden", "cálculo", "dinero")
+    rng = random.Random(str(semilla))
+    texto = []
+    while sum(len(palabra) + 1 for palabra in texto) < longitud:
+        texto.append(rng.choice(palabras))
+    return " ".join(texto)[:longitud]
+
+
+# Respuesta de una solicitud agrupada de diccionario/glosario.py: un objeto por
+# elemento "[n]" del prompt con los campos del formato pedido
+def _glosario(prompt, tokens):
+    ids = [int(i) for i in re.findall(r"^\[(\d+)\] ", prompt, re.MULTILINE)]
+    formato = next(json.loads(linea) for linea in prompt.splitlines() if linea.startswith('[{"id"'))
+    campos = [campo for campo in formato[0] if campo != "id"]
+    return json.dumps([{"id": i, **{campo: " ".join(tokens) for campo in campos}} for i in ids], ensure_ascii=False)
+
+
+class ServidorSimulado:
+    def __init__(self, configuracion=None, puerto=0, host="127.0.0.1"):
+        self.configuracion = {proveedor: ConfiguracionProveedor() for proveedor in PROVEEDORES}
+        self.configuracion.update(configuracion or {})
+        self._contadores = {}
+        self._en_curso = {proveedor: 0 for proveedor in PROVEEDORES}
+        self._lock = threading.Lock()
+        self._servidores = {}
+        for i, proveedor in enumerate(PROVEEDORES):
+            self._servidores[proveedor] = ThreadingHTTPServer((host, puerto + i if puerto else 0), self._manejador())
+            self._servidores[proveedor].daemon_threads = True
+
+    def url(self, proveedor):
+        host, puerto = self._servidores[proveedor].server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def variables_entorno(self):
+        return {
+            "DICCIONARIO_URL_SERPER": f"{self.url('serper')}/search",
+            "DICCIONARIO_URL_SERPLY": f"{self.url('serply')}/v1/scholar/q=",
+            "DICCIONARIO_URL_TOGETHER": f"{self.url('together')}/inference",
+        }
+
+    def iniciar(self):
+        for proveedor, servidor in self._servidores.items():
+            threading.Thread(target=servidor.serve_forever, name=f"simulado-{proveedor}", daemon=True).start()
+        return self
+
+    def detener(self):
+        for servidor in self._servidores.values():
+            servidor.shutdown()
+            servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+    def _contar(self, proveedor, estado):
+        with self._lock:
+            self._contadores[(proveedor, estado)] = self._contadores.get((proveedor, estado), 0) + 1
+
+    # {proveedor: {estado: solicitudes}}; con `reiniciar` los contadores vuelven a cero
+    def contadores(self, reiniciar=False):
+        with self._lock:
+            resultado = {}
+            for (proveedor, estado), cuenta in self._contadores.items():
+                resultado.setdefault(proveedor, {})[estado] = cuenta
+            if reiniciar:
+                self._contadores.clear()
+        return resultado
+
+    def _manejador(self):
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _cuerpo(self):
+                longitud = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(longitud) or b"null")
+
+            def _json(self, estado, datos, cabeceras=()):
+                cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+                self.send_response(estado)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                for nombre, valor in cabeceras:
+                    self.send_header(nombre, valor)
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            # Espera la latencia simulada; devuelve False si se respondió con 429
+            def _simular(self, proveedor):
+                configuracion = servidor.configuracion[proveedor]
+                with servidor._lock:
+                    saturado = configuracion.capacidad and servidor._en_curso[proveedor] >= configuracion.capacidad
+                    if not saturado:
+                        servidor._en_curso[proveedor] += 1
+                if saturado or random.random() < configuracion.tasa_429:
+                    if not saturado:
+                        with servidor._lock:
+                            servidor._en_curso[proveedor] -= 1
+                    servidor._contar(proveedor, 429)
+                    self._json(429, {"error": "rate limit"}, [("Retry-After", str(configuracion.retry_after))])
+                    return False
+                try:
+                    time.sleep(max(0.0, configuracion.latencia()))
+                finally:
+                    with servidor._lock:
+                        servidor._en_curso[proveedor] -= 1
+                servidor._contar(proveedor, 200)
+                return True
+
+            def do_GET(self):
+                if not self.path.startswith("/v1/scholar/q="):
+                    self._json(404, {"error": "not found"})
+                    return
+                if not self._simular("serply"):
+                    return
+                configuracion = servidor.configuracion["serply"]
+                consulta = unquote(self.path[len("/v1/scholar/q="):])
+                self._json(200, {"results": [
+                    {"title": f"{consulta} {i}", "url": f"https://scholar.example/{i}", "author": "Autor", "year": "2000",
+                     "journal": "Revista", "snippet": _texto((consulta, i), configuracion.longitud_fragmento)}
+                    for i in range(configuracion.resultados)
+                ]})
+
+            def do_POST(self):
+                cuerpo = self._cuerpo()
+                if self.path == "/search":
+                    self._serper(cuerpo)
+                elif self.path == "/inference":
+                    self._together(cuerpo)
+                else:
+                    self._json(404, {"error": "not found"})
+
+            def _serper(self, cuerpo):
+                if not self._simular("serper"):
+                    return
+                configuracion = servidor.configuracion["serper"]
+
+                def resultado(consulta):
+                    return {"organic": [
+                        {"link": f"https://web.example/{i}", "snippet": _texto((consulta["q"], i), configuracion.longitud_fragmento)}
+                        for i in range(configuracion.resultados)
+                    ]}
+                self._json(200, [resultado(consulta) for consulta in cuerpo] if isinstance(cuerpo, list) else resultado(cuerpo))
+
+            def _together(self, cuerpo):
+                if not self._simular("together"):
+                    return
+                configuracion = servidor.configuracion["together"]
+                prompt = cuerpo.get("prompt", "")
+                tokens = _texto(prompt, configuracion.tokens * 7).split(" ")[:configuracion.tokens]
+                if not cuerpo.get("stream_tokens"):
+                    self._json(200, {"output": {
+                        "choices": [{"text": _glosario(prompt, tokens) if prompt.endswith("JSON:") else " ".join(tokens)}],
+                        "usage": {"prompt_tokens": len(cuerpo.get("prompt", "").split()), "completion_tokens": len(tokens)}
+                    }})
+                    return
+                # Server-sent events: un evento por token y cierre de la conexión al terminar
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for token in tokens:
+                    self.wfile.write(f"data: {json.dumps({'choices': [{'text': token + ' '}]})}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if configuracion.intervalo_token:
+                        time.sleep(configuracion.intervalo_token)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Manejador
+
+
+# Opciones de línea de comandos de cada proveedor (las comparte benchmarks/carga.py)
+def agregar_argumentos(parser):
+    for proveedor, latencia in (("serper", "lognormal:0.3:0.4"), ("serply", "lognormal:0.6:0.5"), ("together", "lognormal:1.5:0.4")):
+        parser.add_argument(f"--latencia-{proveedor}", default=latencia,
+                            help=f"latencia de {proveedor}: fija:S, uniforme:A:B, lognormal:MEDIANA:SIGMA o exponencial:MEDIA (por defecto {latencia})")
+        parser.add_argument(f"--tasa-429-{proveedor}", type=float, default=0.0, help=f"proporción de respuestas 429 de {proveedor}")
+        parser.add_argument(f"--capacidad-{proveedor}", type=int, default=0,
+                            help=f"solicitudes simultáneas que admite {proveedor} antes de responder 429 (0 = sin límite)")
+    parser.add_argument("--retry-after", type=int, default=1, help="segundos (enteros) de la cabecera Retry-After de las respuestas 429")
+    parser.add_argument("--resultados", type=int, default=10, help="resultados por búsqueda")
+    parser.add_argument("--longitud-fragmento", type=int, default=200, help="caracteres por fragmento de búsqueda")
+    parser.add_argument("--tokens", type=int, default=300, help="tokens por completado")
+    parser.add_argument("--intervalo-token", type=float, default=0.0, help="segundos entre tokens en streaming")
+
+
+def configuracion_desde_argumentos(args):
+    return {
+        proveedor: ConfiguracionProveedor(
+            latencia=getattr(args, f"latencia_{proveedor}"), tasa_429=getattr(args, f"tasa_429_{proveedor}"),
+            capacidad=getattr(args, f"capacidad_{proveedor}"),
+            retry_after=args.retry_after, resultados=args.resultados, longitud_fragmento=args.longitud_fragmento,
+            tokens=args.tokens, intervalo_token=args.intervalo_token
+        )
+        for proveedor in PROVEEDORES
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidores simulados de Serper, Serply y Together.")
+    parser.add_argument("--puerto", type=int, default=8099, help="puerto de Serper (Serply y Together usan los dos siguientes)")
+    agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    servidor = ServidorSimulado(configuracion_desde_argumentos(args), puerto=args.puerto).iniciar()
+    for nombre, valor in servidor.variables_entorno().items():
+        print(f"export {nombre}={valor}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Mide el tiempo de importación en frío (un intérprete nuevo por repetición)
+# de los módulos que cargan las aplicaciones al arrancar, y compara con el
+# coste de las dependencias pesadas que antes se importaban al inicio
+# (requests y python-docx).
+#
+#   python benchmarks/tiempo_importacion.py --repeticiones 20
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos del paquete que importan los scripts de Streamlit al cargarse
+MODULOS_APLICACIONES = [
+    "diccionario.cliente_http",
+    "diccionario.cache",
+    "diccionario.colecciones",
+    "diccionario.concurrencia",
+    "diccionario.contexto",
+    "diccionario.datos",
+    "diccionario.exportadores",
+    "diccionario.indice",
+    "diccionario.streaming",
+    "diccionario.metricas",
+    "diccionario.trabajos",
+    "diccionario.glosario",
+]
+
+# Dependencias que ya no se cargan en el arranque
+DEPENDENCIAS_DIFERIDAS = ["requests", "docx"]
+
+_MEDIR = """
+import sys, time
+inicio = time.perf_counter()
+for modulo in sys.argv[1:]:
+    __import__(modulo)
+print(time.perf_counter() - inicio)
+print(",".join(m for m in {diferidas!r} if m in sys.modules))
+"""
+
+
+def medir(modulos, repeticiones):
+    codigo = _MEDIR.format(diferidas=DEPENDENCIAS_DIFERIDAS)
+    tiempos, cargadas = [], ""
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo, *modulos],
+            cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.split("\n")
+        tiempos.append(float(salida[0]))
+        cargadas = salida[1]
+    return statistics.median(tiempos), cargadas
+
+
+def disponible(modulo):
+    return subprocess.run([sys.executable, "-c", f"import {modulo}"], capture_output=True).returncode == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación en frío de los módulos de las aplicaciones.")
+    parser.add_argument("--repeticiones", type=int, default=10, help="intérpretes nuevos por medición")
+    args = parser.parse_args(argv)
+
+    mediana, cargadas = medir(MODULOS_APLICACIONES, args.repeticiones)
+    print(f"{'módulos de las aplicaciones':<32} {mediana * 1000:8.1f} ms  (cargadas: {cargadas or 'ninguna'})")
+
+    for dependencia in DEPENDENCIAS_DIFERIDAS:
+        if not disponible(dependencia):
+            print(f"{dependencia:<32} {'no instalada':>11}")
+            continue
+        mediana_dependencia, _ = medir([dependencia], args.repeticiones)
+        print(f"{dependencia:<32} {mediana_dependencia * 1000:8.1f} ms  (ahorrado en el arranque)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Utilidades compartidas por las aplicaciones del diccionario.
@@ -0,0 +1,319 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields, replace
+
+from diccionario import cliente_http, metricas
+from diccionario.cache import clave_argumentos, con_cache, con_cache_lote
+from diccionario.concurrencia import ejecutar_en_paralelo
+from diccionario.contexto import construir_contexto
+
+
+# Referencia académica de un resultado de Serply. Los valores por defecto se
+# aplican al extraerla de la respuesta; los campos coinciden con los de la API.
+@dataclass(slots=True)
+class Fuente:
+    url: str
+    title: str = ""
+    author: str = ""
+    year: str = ""
+    journal: str = ""
+    volume: str = ""
+    issue: str = ""
+    pages: str = ""
+
+    def referencia(self):
+        return f"{self.author}. ({self.year}). *{self.title}*. {self.journal}, {self.volume}({self.issue}), {self.pages}. {self.url}"
+
+    # Las fuentes que vuelven del índice, del diario o de la caché llegan como diccionarios
+    @classmethod
+    def desde_json(cls, valor):
+        if isinstance(valor, cls):
+            return valor
+        return cls(**{campo: valor[campo] for campo in _CAMPOS_FUENTE if campo in valor})
+
+
+_CAMPOS_FUENTE = [campo.name for campo in fields(Fuente)]
+
+
+# Resultado de una búsqueda ya extraído de la respuesta del proveedor: los
+# fragmentos de texto para el contexto del prompt y las fuentes que se citan
+# (enlaces en Serper; `Fuente` en Serply). La respuesta completa no se conserva.
+@dataclass(slots=True)
+class ResultadoBusqueda:
+    fragmentos: tuple = ()
+    fuentes: tuple = ()
+
+    # Fragmentos sin duplicados, ordenados por relevancia y limitados al presupuesto de tokens
+    def contexto(self, termino, **opciones):
+        return construir_contexto(self.fragmentos, termino, **opciones)
+
+
+# Base de los proveedores de búsqueda. Cada consulta son las `partes` (p. ej.
+# término y autor) más un `sufijo` fijo de la aplicación. Cada respuesta válida
+# se convierte una sola vez en un `ResultadoBusqueda`, que es lo que se guarda
+# en la caché persistente (`espacio` + "_registros", para no mezclarlo con las
+# respuestas completas que se guardaban antes) con la clave normalizada de las
+# partes; las subclases definen `solicitar`, `extraer` y `es_valido`.
+class Buscador:
+    def __init__(self, api_key, espacio, sufijo=""):
+        self.api_key = api_key
+        self.sufijo = sufijo
+        self.espacio = espacio + "_registros"
+        self._buscar = con_cache(self.espacio, self._obtener)
+
+    def consulta(self, partes):
+        return " ".join([*(str(parte) for parte in partes), self.sufijo]).strip()
+
+    def _registro(self, respuesta):
+        return self.extraer(respuesta) if self.es_valido(respuesta) else None
+
+    def _obtener(self, *partes):
+        with metricas.medir("busqueda", proveedor=self.PROVEEDOR):
+            respuesta = self.solicitar(*partes)
+        if not self.es_valido(respuesta):
+            raise RuntimeError(f"Respuesta de búsqueda no válida: {str(respuesta)[:200]}")
+        return self.extraer(respuesta)
+
+    # Los registros leídos de la caché llegan como diccionarios
+    def _resultado(self, registro):
+        if registro is None:
+            return ResultadoBusqueda()
+        if isinstance(registro, ResultadoBusqueda):
+            return registro
+        return ResultadoBusqueda(tuple(registro["fragmentos"]), tuple(self.fuente_desde_json(f) for f in registro["fuentes"]))
+
+    @staticmethod
+    def fuente_desde_json(valor):
+        return valor
+
+    def buscar(self, *partes):
+        return self._resultado(self._buscar(*partes))
+
+    # Sin búsqueda por lotes en el proveedor, las consultas van en paralelo (el
+    # límite de concurrencia de cliente_http acota las solicitudes simultáneas)
+    def buscar_lote(self, lista_partes):
+        return ejecutar_en_paralelo(lambda partes: self.buscar(*partes), lista_partes, 8)
+
+    # Resultado guardado en la caché para `partes`, o None si hay que consultar al proveedor
+    def en_cache(self, *partes):
+        registro = self._buscar.cache().obtener(clave_argumentos(partes))
+        return None if registro is None else self._resultado(registro)
+
+    # Convierte un resultado de otro proveedor al tipo de fuentes de este
+    def adaptar(self, resultado):
+        return resultado
+
+
+# Búsqueda web de Serper (resultados "organic"). Las URL de los proveedores se
+# pueden redirigir con variables de entorno (p. ej. a los servidores simulados
+# de benchmarks/servidores_simulados.py).
+class BuscadorSerper(Buscador):
+    URL = os.environ.get("DICCIONARIO_URL_SERPER", "https://google.serper.dev/search")
+    PROVEEDOR = "serper"
+
+    def __init__(self, api_key, espacio, sufijo=""):
+        super().__init__(api_key, espacio, sufijo)
+        self._buscar_lote = con_cache_lote(self.espacio, self._obtener_lote)
+
+    def _post(self, payload):
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+        response = cliente_http.post(self.URL, headers=headers, data=json.dumps(payload))
+        if response.status_code != 200:
+            raise RuntimeError(f"Error en la búsqueda: {response.status_code} - {response.text}")
+        return response.json()
+
+    def solicitar(self, *partes):
+        return self._post({"q": self.consulta(partes)})
+
+    # Serper acepta una lista de consultas en una sola solicitud POST
+    def solicitar_lote(self, lista_partes):
+        resultados = self._post([{"q": self.consulta(partes)} for partes in lista_partes])
+        if not isinstance(resultados, list):
+            # Respuesta de error: se devuelve a cada consulta, como en la búsqueda individual
+            return [resultados] * len(lista_partes)
+        return resultados
+
+    def _obtener_lote(self, lista_partes):
+        with metricas.medir("busqueda_lote", proveedor=self.PROVEEDOR):
+            respuestas = self.solicitar_lote(lista_partes)
+        registros = [self._registro(respuesta) for respuesta in respuestas]
+        if all(registro is None for registro in registros):
+            raise RuntimeError("Respuesta de búsqueda no válida")
+        return registros
+
+    def buscar_lote(self, lista_partes):
+        return [self._resultado(registro) for registro in self._buscar_lote(list(lista_partes))]
+
+    @staticmethod
+    def es_valido(respuesta):
+        return isinstance(respuesta, dict) and "organic" in respuesta
+
+    @staticmethod
+    def extraer(respuesta):
+        organicos = respuesta["organic"]
+        return ResultadoBusqueda(
+            tuple(item.get("snippet") for item in organicos),
+            tuple(item["link"] for item in organicos)
+        )
+
+    # Las fuentes de Serper son los enlaces
+    def adaptar(self, resultado):
+        return replace(resultado, fuentes=tuple(f if isinstance(f, str) else Fuente.desde_json(f).url for f in resultado.fuentes))
+
+
+# Búsqueda académica de Serply (Google Scholar).
+class BuscadorSerply(Buscador):
+    URL = os.environ.get("DICCIONARIO_URL_SERPLY", "https://api.serply.io/v1/scholar/q=")
+    PROVEEDOR = "serply"
+
+    def solicitar(self, *partes):
+        headers = {
+            'X-Api-Key': self.api_key,
+            'Content-Type': 'application/json',
+            'X-Proxy-Location': 'US',
+            'X-User-Agent': 'Mozilla/5.0'
+        }
+        response = cliente_http.get(self.URL + self.consulta(partes), headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"Error en la búsqueda: {response.status_code} - {response.text}")
+        return response.json()
+
+    @staticmethod
+    def es_valido(respuesta):
+        return isinstance(respuesta, dict) and "results" in respuesta
+
+    fuente_desde_json = staticmethod(Fuente.desde_json)
+
+    @staticmethod
+    def extraer(respuesta):
+        resultados = respuesta["results"]
+        return ResultadoBusqueda(
+            tuple(item.get("snippet") for item in resultados),
+            tuple(Fuente(
+                url=item["url"],
+                title=item["title"],
+                author=item.get("author", "Autor desconocido"),
+                year=item.get("year", "s.f."),
+                journal=item.get("journal", "Revista desconocida"),
+                volume=item.get("volume", ""),
+                issue=item.get("issue", ""),
+                pages=item.get("pages", "")
+            ) for item in resultados)
+        )
+
+    # Los enlaces de otros proveedores se convierten en referencias sin datos bibliográficos
+    def adaptar(self, resultado):
+        return replace(resultado, fuentes=tuple(
+            Fuente(url=f, author="Autor desconocido", year="s.f.", journal="Revista desconocida") if isinstance(f, str) else Fuente.desde_json(f)
+            for f in resultado.fuentes
+        ))
+
+
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+
+def _obtener_ejecutor():
+    global _ejecutor
+    with _ejecutor_lock:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="busqueda")
+        return _ejecutor
+
+
+# Enrutador con la misma interfaz que un Buscador sobre varios proveedores en
+# orden de preferencia. Si un proveedor falla se consulta el siguiente
+# (failover). Con `percentil`, si el proveedor en curso tarda más que ese
+# percentil de sus latencias recientes se lanza también el siguiente y se usa
+# la primera respuesta correcta (solicitud cubierta, "hedged request"); la
+# otra termina en segundo plano y queda en su caché. Los resultados se
+# entregan con el tipo de fuentes del primer proveedor.
+class EnrutadorBusqueda:
+    def __init__(self, buscadores, percentil=95, espera_inicial=2.0, muestras=100):
+        self.buscadores = list(buscadores)
+        self.percentil = percentil
+        self.espera_inicial = espera_inicial
+        self._latencias = [deque(maxlen=muestras) for _ in self.buscadores]
+        self._lock = threading.Lock()
+
+    # Segundos de espera antes de cubrir una solicitud al proveedor `indice`
+    def umbral(self, indice):
+        with self._lock:
+            latencias = sorted(self._latencias[indice])
+        if len(latencias) < 10:
+            return self.espera_inicial
+        return latencias[min(len(latencias) - 1, int(len(latencias) * self.percentil / 100))]
+
+    def _ejecutar(self, llamar):
+        ejecutor = _obtener_ejecutor()
+        pendientes = {}
+        siguiente = 0
+        error = None
+
+        def lanzar():
+            nonlocal siguiente
+            indice, siguiente = siguiente, siguiente + 1
+
+            def tarea():
+                inicio = time.monotonic()
+                resultado = llamar(self.buscadores[indice])
+                with self._lock:
+                    self._latencias[indice].append(time.monotonic() - inicio)
+                return resultado
+            pendientes[ejecutor.submit(tarea)] = indice
+
+        lanzar()
+        while pendientes:
+            quedan = siguiente < len(self.buscadores)
+            espera = self.umbral(siguiente - 1) if self.percentil and quedan else None
+            terminados, _ = wait(pendientes, timeout=espera, return_when=FIRST_COMPLETED)
+            if not terminados:
+                # Solicitud cubierta: el proveedor en curso supera el percentil
+                metricas.contar("busqueda_cubiertas", proveedor=self.buscadores[siguiente].PROVEEDOR)
+                lanzar()
+                continue
+            for futuro in terminados:
+                del pendientes[futuro]
+                try:
+                    return futuro.result()
+                except Exception as e:
+                    error = e
+            if not pendientes and siguiente < len(self.buscadores):
+                # Failover: se pasa al siguiente proveedor
+                metricas.contar("busqueda_failover", proveedor=self.buscadores[siguiente].PROVEEDOR)
+                lanzar()
+        raise error
+
+    def buscar(self, *partes):
+        principal = self.buscadores[0]
+        resultado = principal.en_cache(*partes)
+        if resultado is None:
+            resultado = self._ejecutar(lambda buscador: buscador.buscar(*partes))
+        return principal.adaptar(resultado)
+
+    # Sólo las consultas que no están en la caché del primer proveedor se
+    # envían, como un lote, al proveedor que responda primero.
+    def buscar_lote(self, lista_partes):
+        principal = self.buscadores[0]
+        resultados = [principal.en_cache(*partes) for partes in lista_partes]
+        faltantes = [i for i, resultado in enumerate(resultados) if resultado is None]
+        if faltantes:
+            nuevos = self._ejecutar(lambda buscador: buscador.buscar_lote([lista_partes[i] for i in faltantes]))
+            for i, resultado in zip(faltantes, nuevos):
+                resultados[i] = resultado
+        return [principal.adaptar(resultado) for resultado in resultados]
+
+
+# Buscador principal, o un enrutador con `respaldo` si hay proveedores de respaldo configurados
+def crear_buscador(principal, respaldo=(), percentil=95):
+    respaldo = [buscador for buscador in respaldo if buscador is not None]
+    if not respaldo:
+        return principal
+    return EnrutadorBusqueda([principal, *respaldo], percentil=percentil)
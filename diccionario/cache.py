@@ -0,0 +1,252 @@
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from diccionario import metricas
+from diccionario.concurrencia import UnVuelo
+
+RUTA_CACHE = os.environ.get("DICCIONARIO_CACHE", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "diccionario.sqlite"))
+
+
+# Argumento `default` de json.dumps: los registros del paquete (dataclasses como
+# busqueda.Fuente) se guardan como diccionarios.
+def a_json(objeto):
+    if dataclasses.is_dataclass(objeto) and not isinstance(objeto, type):
+        return dataclasses.asdict(objeto)
+    raise TypeError(f"Object of type {type(objeto).__name__} is not JSON serializable")
+
+
+# Normaliza una consulta para usarla como clave: sin acentos, en minúsculas
+# y con los espacios colapsados ("Acción  Humana" -> "accion humana").
+def normalizar_clave(texto):
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", texto).strip().casefold()
+
+
+# Caché persistente clave/valor sobre SQLite con caducidad por entrada (TTL),
+# expulsión LRU cuando se supera `max_entradas` y contadores de aciertos/fallos.
+# Cada `espacio` es una tabla independiente dentro del mismo archivo.
+class CacheDisco:
+    def __init__(self, espacio, ruta=RUTA_CACHE, ttl=7 * 24 * 3600, max_entradas=10000):
+        if not re.fullmatch(r"\w+", espacio):
+            raise ValueError(f"Nombre de espacio no válido: {espacio}")
+        self.espacio = espacio
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute(
+            f"CREATE TABLE IF NOT EXISTS {espacio} ("
+            "clave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira REAL, ultimo_acceso REAL NOT NULL)"
+        )
+        self._conexion.execute(f"CREATE INDEX IF NOT EXISTS {espacio}_lru ON {espacio} (ultimo_acceso)")
+
+    def obtener(self, clave, predeterminado=None):
+        ahora = time.time()
+        with self._lock:
+            fila = self._conexion.execute(
+                f"SELECT valor, expira FROM {self.espacio} WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None or (fila[1] is not None and fila[1] < ahora):
+                if fila is not None:
+                    self._conexion.execute(f"DELETE FROM {self.espacio} WHERE clave = ?", (clave,))
+                self.fallos += 1
+                metricas.contar("cache_consultas", espacio=self.espacio, resultado="fallo")
+                return predeterminado
+            self._conexion.execute(
+                f"UPDATE {self.espacio} SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave)
+            )
+            self.aciertos += 1
+        metricas.contar("cache_consultas", espacio=self.espacio, resultado="acierto")
+        return json.loads(fila[0])
+
+    def guardar(self, clave, valor, ttl=None):
+        ahora = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expira = ahora + ttl if ttl else None
+        with self._lock:
+            self._conexion.execute(
+                f"INSERT OR REPLACE INTO {self.espacio} (clave, valor, expira, ultimo_acceso) VALUES (?, ?, ?, ?)",
+                (clave, json.dumps(valor, ensure_ascii=False, default=a_json), expira, ahora),
+            )
+            self._expulsar()
+
+    def _expulsar(self):
+        total = self._conexion.execute(f"SELECT COUNT(*) FROM {self.espacio}").fetchone()[0]
+        if total > self.max_entradas:
+            self._conexion.execute(
+                f"DELETE FROM {self.espacio} WHERE clave IN "
+                f"(SELECT clave FROM {self.espacio} ORDER BY ultimo_acceso LIMIT ?)",
+                (total - self.max_entradas,),
+            )
+
+    def estadisticas(self):
+        with self._lock:
+            total = self._conexion.execute(f"SELECT COUNT(*) FROM {self.espacio}").fetchone()[0]
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": total}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# Devuelve una caché compartida por todo el proceso (y por todas las
+# sesiones de Streamlit) para el espacio indicado.
+def obtener_cache(espacio, **opciones):
+    with _caches_lock:
+        if espacio not in _caches:
+            _caches[espacio] = CacheDisco(espacio, **opciones)
+        return _caches[espacio]
+
+
+# Clave de caché de una llamada: sus argumentos unidos y normalizados
+def clave_argumentos(args):
+    return normalizar_clave(" ".join(str(a) for a in args))
+
+
+# Llamadas en curso de todo el proceso (todas las sesiones de Streamlit), por
+# (espacio, clave normalizada) en las búsquedas y por clave de completado en el LLM
+_busquedas_en_curso = UnVuelo("busqueda")
+_completados_en_curso = UnVuelo("completado")
+
+
+# Envuelve una función de búsqueda para que consulte la caché antes de llamar
+# a la API. Sólo se guardan las respuestas que `es_valido` acepta, para no
+# conservar errores del proveedor. Las consultas idénticas simultáneas que no
+# están en caché comparten una sola llamada.
+def con_cache(espacio, funcion, es_valido=lambda resultado: resultado is not None, **opciones):
+    def envoltura(*args):
+        cache = obtener_cache(espacio, **opciones)
+        clave = clave_argumentos(args)
+        resultado = cache.obtener(clave)
+        if resultado is None:
+            resultado = _busquedas_en_curso.ejecutar((espacio, clave), lambda: obtener_y_guardar(cache, clave, args))
+        return resultado
+
+    def obtener_y_guardar(cache, clave, args):
+        resultado = funcion(*args)
+        if es_valido(resultado):
+            cache.guardar(clave, resultado)
+        return resultado
+    envoltura.cache = lambda: obtener_cache(espacio, **opciones)
+    return envoltura
+
+
+# Caché LRU en memoria, segura entre hilos.
+class CacheLRU:
+    def __init__(self, max_entradas=256):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, predeterminado=None):
+        with self._lock:
+            if clave not in self._datos:
+                return predeterminado
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+
+# Hash estable (SHA-256) de cualquier valor serializable en JSON.
+def huella(valor):
+    contenido = json.dumps(valor, sort_keys=True, ensure_ascii=False, default=a_json)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+# Clave de contenido de una solicitud al LLM: hash del modelo, el prompt
+# completo y todos los parámetros de muestreo.
+def clave_completado(parametros):
+    return huella(parametros)
+
+
+_completados_memoria = CacheLRU(max_entradas=256)
+
+
+# Busca un completado primero en memoria y luego en disco.
+def obtener_completado(clave):
+    texto = _completados_memoria.obtener(clave)
+    if texto is not None:
+        metricas.contar("cache_consultas", espacio="completados_memoria", resultado="acierto")
+    else:
+        texto = obtener_cache("completados", ttl=30 * 24 * 3600).obtener(clave)
+        if texto is not None:
+            _completados_memoria.guardar(clave, texto)
+    return texto
+
+
+def guardar_completado(clave, texto):
+    obtener_cache("completados", ttl=30 * 24 * 3600).guardar(clave, texto)
+    _completados_memoria.guardar(clave, texto)
+
+
+# Devuelve el completado en caché para `parametros` o lo obtiene con `llamar()`.
+# Por defecto sólo se usa la caché con temperatura 0 (salida determinista);
+# `usar_cache` permite forzarlo en uno u otro sentido. Aun sin caché, las
+# solicitudes idénticas simultáneas comparten un solo completado.
+def completar_con_cache(parametros, llamar, usar_cache=None):
+    if usar_cache is None:
+        usar_cache = parametros.get("temperature", 0) == 0
+    clave = clave_completado(parametros)
+    if not usar_cache:
+        return _completados_en_curso.ejecutar(clave, llamar)
+
+    texto = obtener_completado(clave)
+    if texto is None:
+        texto = _completados_en_curso.ejecutar(clave, lambda: _llamar_y_guardar(clave, llamar))
+    return texto
+
+
+def _llamar_y_guardar(clave, llamar):
+    texto = llamar()
+    if texto:
+        guardar_completado(clave, texto)
+    return texto
+
+
+# Variante por lotes de `con_cache`: `funcion` recibe una lista de tuplas de
+# argumentos y devuelve los resultados en el mismo orden. Sólo se envían al
+# proveedor las consultas que no están en caché; las claves coinciden con las
+# de `con_cache`, así que ambas variantes comparten entradas. Los lotes
+# idénticos simultáneos (mismas consultas pendientes) comparten una llamada.
+def con_cache_lote(espacio, funcion, es_valido=lambda resultado: resultado is not None, **opciones):
+    def envoltura(lista_args):
+        cache = obtener_cache(espacio, **opciones)
+        claves = [clave_argumentos(args) for args in lista_args]
+        resultados = [cache.obtener(clave) for clave in claves]
+        faltantes = [i for i, resultado in enumerate(resultados) if resultado is None]
+        if faltantes:
+            nuevos = _busquedas_en_curso.ejecutar(
+                (espacio, tuple(claves[i] for i in faltantes)),
+                lambda: obtener_y_guardar(cache, [claves[i] for i in faltantes], [lista_args[i] for i in faltantes])
+            )
+            for i, resultado in zip(faltantes, nuevos):
+                resultados[i] = resultado
+        return resultados
+
+    def obtener_y_guardar(cache, claves, lista_args):
+        nuevos = funcion(lista_args)
+        for clave, resultado in zip(claves, nuevos):
+            if es_valido(resultado):
+                cache.guardar(clave, resultado)
+        return nuevos
+    return envoltura
@@ -0,0 +1,168 @@
+import email.utils
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from diccionario import metricas
+from diccionario.concurrencia import LimiteAdaptativo
+
+# Tiempos de espera (segundos) para establecer la conexión y para leer la respuesta.
+# En las respuestas en streaming el tiempo de lectura se aplica entre fragmentos.
+TIMEOUT_CONEXION = float(os.environ.get("DICCIONARIO_TIMEOUT_CONEXION", 5))
+TIMEOUT_LECTURA = float(os.environ.get("DICCIONARIO_TIMEOUT_LECTURA", 120))
+
+# Reintentos con espera exponencial (0.5 s, 1 s, 2 s...) ante errores de
+# conexión y del servidor. Son los argumentos de urllib3.util.retry.Retry; las
+# respuestas de sobrecarga (429/503) y su Retry-After los gestiona `solicitar`.
+# Un tiempo de lectura agotado no se reintenta: el proveedor ya recibió la
+# solicitud, y repetir un POST a Together repetiría una generación de pago.
+REINTENTOS = dict(
+    total=3,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 504),
+    allowed_methods=None,
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+
+# Solicitudes simultáneas por proveedor (host y puerto): el límite parte de
+# CONCURRENCIA_INICIAL y se adapta entre 1 y CONCURRENCIA_MAXIMA según las
+# respuestas 429/503 y la latencia (ver concurrencia.LimiteAdaptativo). Es
+# común a todas las sesiones y lotes del proceso. El valor inicial no baja del
+# máximo de autores simultáneos de app.py, para no hacerlos esperar en frío.
+CONCURRENCIA_INICIAL = int(os.environ.get("DICCIONARIO_CONCURRENCIA_INICIAL", 8))
+CONCURRENCIA_MAXIMA = int(os.environ.get("DICCIONARIO_CONCURRENCIA_MAXIMA", 32))
+
+# Estados que indican que el proveedor está saturado. Se reintentan fuera de
+# urllib3 para que el límite se reduzca y respete Retry-After antes del
+# siguiente intento; sin Retry-After se espera ESPERA_SOBRECARGA, 2× y 4×.
+# Retry-After detiene todas las solicitudes al proveedor, así que se limita a
+# RETRY_AFTER_MAXIMO segundos para que una cabecera errónea no las bloquee.
+ESTADOS_SOBRECARGA = (429, 503)
+REINTENTOS_SOBRECARGA = 3
+ESPERA_SOBRECARGA = 0.5
+RETRY_AFTER_MAXIMO = float(os.environ.get("DICCIONARIO_RETRY_AFTER_MAXIMO", 60))
+
+_sesion = None
+_sesion_lock = threading.Lock()
+_limites = {}
+
+
+# Sesión compartida por todo el proceso: reutiliza las conexiones TCP/TLS
+# (keep-alive) con Serper, Serply y Together en lugar de abrir una por llamada.
+# urllib3 sólo habla HTTP/1.1, así que la ganancia proviene del pool de conexiones.
+# requests se importa en la primera solicitud y no al cargar las aplicaciones.
+def obtener_sesion():
+    global _sesion
+    with _sesion_lock:
+        if _sesion is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=Retry(**REINTENTOS))
+            adaptador.poolmanager.pool_classes_by_scheme = _pools_medidos()
+            sesion.mount("https://", adaptador)
+            sesion.mount("http://", adaptador)
+            _sesion = sesion
+        return _sesion
+
+
+# Pools de urllib3 cuyas conexiones miden el establecimiento de cada conexión
+# nueva (DNS, TCP y TLS); las reutilizadas por keep-alive no lo pagan.
+def _pools_medidos():
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def medida(clase):
+        class ConexionMedida(clase):
+            def connect(self):
+                with metricas.medir("http_conexion", host=self.host):
+                    super().connect()
+        return ConexionMedida
+
+    class PoolHttp(HTTPConnectionPool):
+        ConnectionCls = medida(HTTPConnection)
+
+    class PoolHttps(HTTPSConnectionPool):
+        ConnectionCls = medida(HTTPSConnection)
+
+    return {"http": PoolHttp, "https": PoolHttps}
+
+
+def obtener_limite(host):
+    with _sesion_lock:
+        if host not in _limites:
+            _limites[host] = LimiteAdaptativo(CONCURRENCIA_INICIAL, maximo=CONCURRENCIA_MAXIMA, pausa_maxima=RETRY_AFTER_MAXIMO)
+        return _limites[host]
+
+
+# Segundos de una cabecera Retry-After (número de segundos o fecha HTTP)
+def segundos_retry_after(valor):
+    if not valor:
+        return None
+    if valor.strip().isdigit():
+        return float(valor)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Tiempo de espera agotado al conectar o al leer. Tras los reintentos de
+# urllib3, requests lo entrega como ConnectionError con el ReadTimeoutError o
+# ConnectTimeoutError de urllib3 como causa, no como requests.Timeout.
+def es_timeout(error):
+    import requests
+    from urllib3.exceptions import TimeoutError as TimeoutUrllib3
+
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    causa = error.args[0] if error.args else None
+    return isinstance(getattr(causa, "reason", causa), TimeoutUrllib3)
+
+
+# Con `stream=True` el tiempo medido (y la plaza en el límite de concurrencia)
+# llega hasta las cabeceras de la respuesta. La espera por una plaza se mide
+# aparte (http_espera_limite) para no atribuirla al proveedor.
+def solicitar(metodo, url, **kwargs):
+    kwargs.setdefault("timeout", (TIMEOUT_CONEXION, TIMEOUT_LECTURA))
+    host = urlsplit(url).netloc
+    limite = obtener_limite(host)
+    for intento in range(REINTENTOS_SOBRECARGA + 1):
+        with metricas.medir("http_espera_limite", host=host):
+            limite.adquirir()
+        inicio = time.perf_counter()
+        try:
+            response = obtener_sesion().request(metodo, url, **kwargs)
+        except Exception as e:
+            # Un tiempo de espera agotado cuenta como sobrecarga del proveedor
+            limite.liberar(sobrecarga=es_timeout(e))
+            metricas.contar("http_solicitudes", host=host, estado="error")
+            raise
+        segundos = time.perf_counter() - inicio
+        metricas.observar("http_solicitud", segundos, host=host)
+        metricas.contar("http_solicitudes", host=host, estado=response.status_code)
+        if response.status_code not in ESTADOS_SOBRECARGA:
+            limite.liberar(segundos)
+            break
+        retry_after = segundos_retry_after(response.headers.get("Retry-After"))
+        limite.liberar(segundos, sobrecarga=True, retry_after=retry_after)
+        if intento == REINTENTOS_SOBRECARGA:
+            break
+        response.close()
+        if retry_after is None:
+            time.sleep(ESPERA_SOBRECARGA * 2 ** intento)
+    metricas.fijar("http_concurrencia_limite", round(limite.limite, 2), host=host)
+    return response
+
+
+def get(url, **kwargs):
+    return solicitar("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return solicitar("POST", url, **kwargs)
@@ -0,0 +1,213 @@
+import os
+
+from diccionario import datos, metricas
+from diccionario.busqueda import BuscadorSerper, BuscadorSerply, Fuente, crear_buscador
+from diccionario.cache import RUTA_CACHE
+from diccionario.concurrencia import CubetaTokens
+from diccionario.exportadores import crear_escritor, formato_de_ruta
+from diccionario.llm import Together
+from diccionario.lotes import generar_lote
+
+# Búsqueda y generación de las colecciones del índice que sirven app.py,
+# serply.py, refutaciones.py y serplyapp.py. Las comparten la aplicación (un
+# término a la vez), el lote de serplyall.py y generar_diccionario.py
+# --coleccion, que precalcula todos los términos predefinidos, de modo que
+# todos producen las mismas entradas.
+
+
+# Base de las colecciones: `COLECCION` del índice, `TERMINOS` predefinidos
+# (términos o pares (termino, autor)) y búsqueda con `BUSCADOR` (y `RESPALDO`
+# si se indica su clave; ver `EnrutadorBusqueda`) en la caché `ESPACIO`,
+# añadiendo `SUFIJO` a las consultas. La subclase define
+# `generar_entrada(elemento, contexto)`.
+class Coleccion:
+    COLECCION = None
+    TERMINOS = []
+    BUSCADOR, RESPALDO = BuscadorSerper, BuscadorSerply
+    ESPACIO = None
+    SUFIJO = ""
+    # Nombre del documento del lote completo, en las colecciones que lo exportan
+    DOCUMENTO = None
+
+    def __init__(self, busqueda_api_key, together_api_key, respaldo_api_key=None, percentil_cobertura=95):
+        # Las búsquedas se guardan en una caché persistente con claves normalizadas
+        self.buscador = crear_buscador(
+            self.BUSCADOR(busqueda_api_key, f"busqueda_{self.BUSCADOR.PROVEEDOR}_{self.ESPACIO}", sufijo=self.SUFIJO),
+            [self.RESPALDO(respaldo_api_key, f"busqueda_{self.RESPALDO.PROVEEDOR}_{self.ESPACIO}", sufijo=self.SUFIJO) if respaldo_api_key else None],
+            percentil=percentil_cobertura
+        )
+        self.llm = Together(together_api_key)
+
+    def ruta_diario(self):
+        return os.path.join(os.path.dirname(RUTA_CACHE), f"lote_{self.COLECCION}.jsonl")
+
+    def procesar_busqueda(self, elemento):
+        partes = elemento if isinstance(elemento, tuple) else (elemento,)
+        # Buscar información relevante
+        resultado = self.buscador.buscar(*partes)
+        return resultado.contexto(partes[0]), resultado.fuentes
+
+    def procesar_generacion(self, elemento, busqueda):
+        contexto, fuentes = busqueda
+        entrada = self.generar_entrada(elemento, contexto)
+        if not entrada:
+            raise RuntimeError("El modelo no devolvió ninguna entrada.")
+        return entrada, fuentes
+
+    # Genera y guarda en el índice las entradas de `terminos`; ver `generar_lote`.
+    # Las entradas no se acumulan en memoria: se entregan a `al_entrada`. Sin `busqueda_rps`/`generacion_rps` no hay cuota fija: las solicitudes
+    # simultáneas a cada proveedor las regula el límite adaptativo de
+    # cliente_http, y los workers son sólo el máximo de términos en curso.
+    def generar(self, terminos=None, diario=None, indice=None, reanudar=True, al_progresar=None, al_entrada=None,
+                workers_busqueda=16, workers_generacion=16, busqueda_rps=None, generacion_rps=None):
+        return generar_lote(
+            self.TERMINOS if terminos is None else terminos, self.procesar_busqueda, self.procesar_generacion,
+            diario=diario, indice=indice, coleccion=self.COLECCION, reanudar=reanudar,
+            al_progresar=al_progresar, al_entrada=al_entrada or (lambda *entrada: None),
+            workers_busqueda=workers_busqueda, workers_generacion=workers_generacion,
+            limite_busqueda=CubetaTokens(busqueda_rps) if busqueda_rps else None,
+            limite_generacion=CubetaTokens(generacion_rps) if generacion_rps else None
+        )
+
+
+# Definiciones término × autor de app.py (Serper, con Serply de respaldo)
+class ColeccionAutores(Coleccion):
+    COLECCION = "autores_escuela_austriaca"
+    TERMINOS = [(termino, autor) for termino in datos.TERMINOS_AUTORES for autor in datos.AUTORES_AUSTRIACOS]
+    ESPACIO = "austriaca"
+    SUFIJO = "Escuela Austríaca de Economía"
+
+    def generar_definicion(self, termino, autor, contexto):
+        prompt = f"Contexto: {contexto}\n\nTérmino: {termino}\nAutor: {autor}\n\nProporciona una definición del término económico '{termino}' según el pensamiento de {autor}, un autor de la Escuela Austríaca de Economía. La definición debe ser concisa pero informativa, similar a una entrada de diccionario. Si es posible, incluye una referencia a una obra específica de {autor} que trate este concepto.\n\nDefinición:"
+        # Con temperatura 0 la respuesta es determinista y se reutiliza desde la caché
+        return self.llm.completar(prompt)
+
+    def generar_entrada(self, elemento, contexto):
+        return self.generar_definicion(*elemento, contexto)
+
+
+# Definiciones de serply.py (Serply scholar, con Serper de respaldo)
+class ColeccionEscuelaAustriaca(Coleccion):
+    COLECCION = "escuela_austriaca"
+    TERMINOS = datos.TERMINOS_ESCUELA_AUSTRIACA
+    BUSCADOR, RESPALDO = BuscadorSerply, BuscadorSerper
+    ESPACIO = "austrian_school"
+    SUFIJO = "Austrian School of Economics"
+
+    def generar_definicion(self, termino, contexto, stream=False):
+        prompt = f"Contexto: {contexto}\n\nTérmino: {termino}\n\nProporciona una definición del término económico '{termino}' según la visión de la Escuela Austríaca de Economía. La definición debe ser detallada e informativa, similar a una entrada de diccionario extendida. Incluye referencias a economistas austriacos relevantes y conceptos relacionados.\n\nDefinición:"
+        # Con temperatura 0.7 la salida varía entre llamadas; no se reutilizan completados
+        return self.llm.completar(prompt, stream=stream, usar_cache=False, temperature=0.7, repetition_penalty=1)
+
+    def generar_entrada(self, termino, contexto):
+        return self.generar_definicion(termino, contexto)
+
+
+# Definición y refutación de refutaciones.py (Serper, con Serply de respaldo).
+# El índice guarda ambas en un solo texto separado por "Refutación filosófica:".
+class ColeccionRefutaciones(Coleccion):
+    COLECCION = "refutaciones"
+    TERMINOS = datos.TERMINOS_SOCIALISTAS
+    ESPACIO = "socialismo"
+    SUFIJO = "socialismo marxismo"
+
+    def generar_definicion_y_refutacion(self, termino, contexto, stream=False):
+        prompt = f"""Contexto: {contexto}
+
+Término: {termino}
+
+1. Proporciona una definición concisa pero informativa del término o tesis socialista/marxista '{termino}', similar a una entrada de diccionario.
+
+2. Luego, proporciona una refutación o crítica amplia y fundamentada desde un punto de vista general o filosófico. Esta refutación debe:
+   - Abordar los principios fundamentales y las implicaciones filosóficas del concepto.
+   - Considerar aspectos éticos, políticos y sociales más allá de lo puramente económico.
+   - Presentar argumentos lógicos y ejemplos históricos o teóricos relevantes.
+   - Explorar las posibles contradicciones o debilidades en la teoría.
+   - Ofrecer perspectivas alternativas de diferentes escuelas de pensamiento.
+
+La refutación debe ser equilibrada, académica y basada en un análisis crítico profundo.
+
+Definición:
+
+Refutación filosófica:"""
+        # Con temperatura 0 la respuesta es determinista y se reutiliza desde la caché
+        return self.llm.completar(prompt, stream=stream)
+
+    def generar_entrada(self, termino, contexto):
+        return self.generar_definicion_y_refutacion(termino, contexto).strip()
+
+
+# Entradas extendidas de serplyapp.py y del lote de serplyall.py (Serply
+# scholar, con Serper de respaldo). Es la única colección con documento: el
+# lote completo se puede exportar a `DOCUMENTO`.
+class ColeccionExtendida(Coleccion):
+    COLECCION = "escuela_austriaca_extendida"
+    TERMINOS = datos.TERMINOS_EXTENDIDOS
+    BUSCADOR, RESPALDO = BuscadorSerply, BuscadorSerper
+    ESPACIO = "scholar"
+    DOCUMENTO = "Diccionario_Economico_Austriaco_Batch.docx"
+
+    # El diario conserva el nombre de los lotes anteriores de serplyall.py
+    def ruta_diario(self):
+        return os.path.join(os.path.dirname(RUTA_CACHE), "lote_serplyall.jsonl")
+
+    def generar_definicion(self, termino, contexto, stream=False):
+        prompt = f"Contexto: {contexto}\n\nTérmino: {termino}\n\nProporciona una definición del término económico '{termino}' según la visión de la escuela austríaca de economía. La definición debe ser más larga, detallada, e informativa, similar a una entrada de diccionario extendida. Incluye referencias a fuentes específicas que traten este concepto.\n\nDefinición:"
+        # Con temperatura 0.7 la salida varía entre llamadas; no se reutilizan completados
+        return self.llm.completar(prompt, stream=stream, usar_cache=False, temperature=0.7, repetition_penalty=1)
+
+    def generar_entrada(self, termino, contexto):
+        return self.generar_definicion(termino, contexto)
+
+    # Genera el lote escribiendo cada entrada en `ruta` a medida que termina, en el
+    # orden de `terminos`. `formato` es una clave de exportadores.FORMATOS (por
+    # defecto, el que corresponde a la extensión). Devuelve (numero_de_entradas, fallidos).
+    def exportar(self, ruta, terminos=None, formato=None, **opciones):
+        escritas = 0
+        formato = formato or formato_de_ruta(ruta)
+        with crear_escritor(formato, ruta) as doc:
+            self.escribir_encabezado(doc)
+
+            def al_entrada(termino, definicion, fuentes):
+                nonlocal escritas
+                with metricas.medir("exportacion_entrada", formato=formato):
+                    self.escribir_entrada(doc, termino, definicion, fuentes)
+                escritas += 1
+
+            _, fallidos = self.generar(terminos, al_entrada=al_entrada, **opciones)
+            self.escribir_nota(doc)
+        return escritas, fallidos
+
+    # El documento se escribe por partes para poder volcar cada entrada en cuanto
+    # termina; `doc` es cualquier escritor de diccionario.exportadores.
+    @staticmethod
+    def escribir_encabezado(doc):
+        doc.add_heading('Diccionario Económico - Escuela Austríaca', 0)
+
+    @staticmethod
+    def escribir_entrada(doc, termino, definicion, fuentes, salto_pagina=True):
+        def disponer(doc):
+            doc.add_heading('Término', level=1)
+            doc.add_paragraph(termino)
+            doc.add_heading('Definición', level=2)
+            doc.add_paragraph(definicion)
+            if fuentes:
+                doc.add_heading('Fuentes', level=3)
+                for fuente in fuentes:
+                    doc.add_paragraph(Fuente.desde_json(fuente).referencia(), style='List Bullet')
+
+        doc.add_entry({"termino": termino, "definicion": definicion, "fuentes": fuentes}, disponer)
+        if salto_pagina:
+            doc.add_page_break()
+
+    @staticmethod
+    def escribir_nota(doc):
+        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
+
+
+COLECCIONES = {
+    "extendida": ColeccionExtendida,
+    "autores": ColeccionAutores,
+    "escuela_austriaca": ColeccionEscuelaAustriaca,
+    "refutaciones": ColeccionRefutaciones,
+}
@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from diccionario import metricas
+
+
+# Ejecuta `funcion` sobre cada elemento en un grupo de hilos acotado.
+# Los resultados se devuelven en el mismo orden que `elementos`.
+def ejecutar_en_paralelo(funcion, elementos, max_concurrencia=5):
+    elementos = list(elementos)
+    if not elementos:
+        return []
+    max_concurrencia = max(1, min(int(max_concurrencia), len(elementos)))
+    if max_concurrencia == 1:
+        return [funcion(elemento) for elemento in elementos]
+    with ThreadPoolExecutor(max_workers=max_concurrencia) as ejecutor:
+        return list(ejecutor.map(funcion, elementos))
+
+
+# Limitador de tasa de tipo "token bucket": permite ráfagas de hasta
+# `capacidad` solicitudes y después un ritmo sostenido de `tasa` por segundo.
+class CubetaTokens:
+    def __init__(self, tasa, capacidad=None):
+        if tasa <= 0:
+            raise ValueError("La tasa debe ser mayor que cero")
+        self.tasa = float(tasa)
+        self.capacidad = float(capacidad if capacidad is not None else max(1.0, self.tasa))
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self, tokens=1):
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                espera = (tokens - self._tokens) / self.tasa
+            time.sleep(espera)
+
+
+# Limitador adaptativo de solicitudes simultáneas a un proveedor (AIMD). El
+# límite crece en 1/límite por cada respuesta rápida mientras está en uso
+# completo y se reduce a la mitad ante una sobrecarga (429/503, tiempo de
+# espera agotado) o a un 90 % si la latencia reciente (media móvil rápida)
+# supera `tolerancia` veces la latencia base (media móvil lenta); como mucho
+# una reducción por ventana de latencia, para que las respuestas de
+# solicitudes que ya estaban en vuelo no lo hundan. Con `retry_after` no se
+# lanza ninguna solicitud nueva hasta que pase ese plazo, como mucho
+# `pausa_maxima` segundos.
+class LimiteAdaptativo:
+    def __init__(self, inicial=4, minimo=1, maximo=32, tolerancia=2.0, pausa_maxima=60.0):
+        self.minimo = minimo
+        self.pausa_maxima = pausa_maxima
+        self.maximo = maximo
+        self.tolerancia = tolerancia
+        self.limite = float(min(max(inicial, minimo), maximo))
+        self._en_vuelo = 0
+        self._latencia_base = None
+        self._latencia_reciente = None
+        self._pausa_hasta = 0.0
+        self._ultima_reduccion = 0.0
+        self._condicion = threading.Condition()
+
+    @property
+    def en_vuelo(self):
+        return self._en_vuelo
+
+    def adquirir(self):
+        with self._condicion:
+            while True:
+                espera = self._pausa_hasta - time.monotonic()
+                if espera <= 0 and self._en_vuelo < int(self.limite):
+                    self._en_vuelo += 1
+                    return
+                self._condicion.wait(timeout=espera if espera > 0 else None)
+
+    def _reducir(self, factor, ahora):
+        if ahora - self._ultima_reduccion >= (self._latencia_base or 0):
+            self.limite = max(self.minimo, self.limite * factor)
+            self._ultima_reduccion = ahora
+
+    # `latencia` en segundos de la solicitud terminada; sin ella no se ajusta el límite
+    def liberar(self, latencia=None, sobrecarga=False, retry_after=None):
+        with self._condicion:
+            saturado = self._en_vuelo >= int(self.limite)
+            self._en_vuelo -= 1
+            ahora = time.monotonic()
+            if sobrecarga:
+                self._reducir(0.5, ahora)
+                if retry_after:
+                    self._pausa_hasta = max(self._pausa_hasta, ahora + min(retry_after, self.pausa_maxima))
+            elif latencia is not None:
+                if self._latencia_base is None:
+                    self._latencia_base = self._latencia_reciente = latencia
+                self._latencia_reciente += (latencia - self._latencia_reciente) * 0.2
+                self._latencia_base += (latencia - self._latencia_base) * 0.02
+                if self._latencia_reciente > self.tolerancia * self._latencia_base:
+                    self._reducir(0.9, ahora)
+                elif saturado:
+                    self.limite = min(self.maximo, self.limite + 1 / self.limite)
+            self._condicion.notify_all()
+
+
+class _Vuelo:
+    __slots__ = ("evento", "resultado", "error")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+# Agrupa llamadas simultáneas idénticas ("single flight"): mientras una
+# llamada con la misma `clave` está en curso, las demás esperan y reciben su
+# resultado (o su excepción) en lugar de repetirla. Una vez termina, la
+# siguiente llamada con esa clave vuelve a ejecutarse (la caché es aparte).
+# `nombre` etiqueta la métrica de llamadas agrupadas.
+class UnVuelo:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self._vuelos = {}
+        self._lock = threading.Lock()
+
+    def ejecutar(self, clave, funcion):
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+        if not lider:
+            metricas.contar("llamadas_agrupadas", tipo=self.nombre)
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+        try:
+            vuelo.resultado = funcion()
+            return vuelo.resultado
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.evento.set()
@@ -0,0 +1,50 @@
+import os
+import re
+
+from diccionario.cache import normalizar_clave
+from diccionario.indice import PALABRAS_VACIAS
+
+# Máximo de tokens de contexto que se añaden al prompt.
+PRESUPUESTO_TOKENS = int(os.environ.get("DICCIONARIO_PRESUPUESTO_CONTEXTO", 1024))
+
+# Aproximación de un tokenizador BPE: las palabras se cortan en piezas de hasta
+# cuatro caracteres y cada signo de puntuación cuenta como un token.
+_PIEZAS = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def estimar_tokens(texto):
+    return len(_PIEZAS.findall(texto))
+
+
+def _palabras(texto):
+    return {palabra for palabra in re.findall(r"\w+", normalizar_clave(texto)) if palabra not in PALABRAS_VACIAS}
+
+
+# Construye el contexto del prompt a partir de los fragmentos de la búsqueda:
+# descarta vacíos y duplicados, ordena por relevancia frente al término
+# (proporción de sus palabras que aparecen en el fragmento, conservando el
+# orden del buscador en caso de empate) y añade fragmentos hasta agotar el
+# presupuesto de tokens.
+def construir_contexto(fragmentos, termino, presupuesto=PRESUPUESTO_TOKENS):
+    palabras_termino = _palabras(termino)
+    vistos = set()
+    candidatos = []
+    for posicion, fragmento in enumerate(fragmentos):
+        fragmento = (fragmento or "").strip()
+        clave = normalizar_clave(fragmento)
+        if not clave or clave in vistos:
+            continue
+        vistos.add(clave)
+        relevancia = len(palabras_termino & _palabras(fragmento)) / len(palabras_termino) if palabras_termino else 0
+        candidatos.append((-relevancia, posicion, fragmento))
+    candidatos.sort()
+
+    seleccionados = []
+    usados = 0
+    for _, _, fragmento in candidatos:
+        tokens = estimar_tokens(fragmento)
+        if usados + tokens > presupuesto:
+            continue
+        seleccionados.append(fragmento)
+        usados += tokens
+    return "\n".join(seleccionados)
@@ -0,0 +1,210 @@
+# Datos estáticos de las aplicaciones (listas de términos y autores, textos de
+# la columna de información). Al estar en un módulo importado, Python los
+# construye una sola vez por proceso en lugar de en cada rerun del script.
+
+# Términos de app.py (definiciones según cada autor)
+TERMINOS_AUTORES = [
+    "Acción humana", "Agio", "Apalancamiento", "Armonía de intereses", "Banca libre", "Beneficio económico", 
+    "Bienes de capital", "Bienes de consumo", "Bimetalismo", "Capital humano", "Capitalismo", "Catalaxia", 
+    "Cálculo económico", "Competencia perfecta", "Conocimiento disperso", "Costos de oportunidad", 
+    "Crítica del socialismo", "Curva de preferencia temporal", "Desajuste del mercado", "Desempleo natural", 
+    "Destrucción creativa", "Dilema del prisionero", "División del trabajo", "Doble contingencia", 
+    "Economía del bienestar", "Economía subjetiva", "Eficiencia de Pareto", "Eficiencia dinámica", 
+    "Empresario", "Equilibrio económico", "Equilibrio general", "Escuela Austríaca", "Escuela de Viena", 
+    "Estructura del capital", "Ëxternalidades", "Falacia del costo hundido", "Función empresarial", "Ganancia empresarial", 
+    "Heterogeneidad del capital", "Horizonte temporal", "Imposición fiscal", "Incentivos económicos", 
+    "Inflación", "Interés", "Intervencionismo", "Inversión de capital", "Ley de la oferta y la demanda", 
+    "Ley de los rendimientos decrecientes", "Ley de Say", "Libertad económica", "Libertarismo", 
+    "Margen de ganancia", "Margen de utilidad", "Método praxeológico", "Método subjetivo", "Moneda fiduciaria", 
+    "Moneda sana", "Monopolio natural", "Niveles de intervención", "Óptimo de Pareto", "Orden espontáneo", 
+    "Preferencia por la liquidez", "Preferencia temporal", "Precio de equilibrio", "Precios relativos", 
+    "Problema del cálculo económico", "Proceso de mercado", "Propiedad común", "Propiedad privada", 
+    "Racionalidad limitada", "Reducción de riesgos", "Rentabilidad", "Restricción presupuestaria", 
+    "Riesgo moral", "Rutas del mercado", "Salario real", "Selección adversa", "Señales de precios", 
+    "Sistema de precios", "Sociedad abierta", "Subjetivismo", "Subproducción", "Substitución", 
+    "Tasa de interés natural", "Teoría de la eficiencia", "Teoría del capital", "Teoría del ciclo económico", 
+    "Teoría del valor", "Teoría del valor subjetivo", "Teoría del valor y precio", "Título de propiedad", 
+    "Tragedia de los comunes", "Utilidad", "Utilidad marginal", "Valor de cambio", "Valor de uso", "Valor esperado", 
+    "Valor trabajo", "Ventaja comparativa", "Voluntarismo", "Vulnerabilidad económica"
+]
+
+# Autores de la Escuela Austríaca de Economía
+AUTORES_AUSTRIACOS = [
+    "Ludwig von Mises", "Friedrich Hayek", "Carl Menger", "Eugen von Böhm-Bawerk", "Murray Rothbard", 
+    "Israel Kirzner", "Hans-Hermann Hoppe", "Joseph Schumpeter", "Ludwig Lachmann", "Walter Block"
+]
+
+# 101 economic terms related to the Austrian School perspective (serply.py)
+TERMINOS_ESCUELA_AUSTRIACA = sorted([
+    "Acción humana", "Ahorro", "Anarcocapitalismo", "Arbitraje", "Banco central", "Banca de reserva fraccionaria",
+    "Bienes de capital", "Bienes de consumo", "Cálculo económico", "Capitalismo", "Ciclo económico austriaco",
+    "Competencia", "Consumo", "Coste de oportunidad", "Crédito", "Deflación", "Demanda", "Depresión económica",
+    "Derechos de propiedad", "Dinero fiduciario", "Dinero mercancía", "División del trabajo", "Economía de mercado",
+    "Efecto Ricardo", "Empresario", "Escasez", "Escuela de Salamanca", "Estado", "Estructura del capital",
+    "Eviccionismo", "Externalidad", "Frontera de posibilidades de producción", "Gobierno", "Hiperinflación",
+    "Homo agens", "Imperialismo monetario", "Incentivos", "Incertidumbre", "Indexación", "Inflación",
+    "Intervención estatal", "Inversión", "Laissez-faire", "Ley de asociación de Ricardo", "Ley de costos",
+    "Ley de la utilidad marginal decreciente", "Ley de oferta y demanda", "Ley de preferencia temporal",
+    "Ley de rendimientos decrecientes", "Ley de Say", "Liberalismo clásico", "Libre mercado", "Liquidez",
+    "Mano invisible", "Marginalismo", "Medios de producción", "Mercado negro", "Metodología apriorística",
+    "Monopolio", "Orden espontáneo", "Patrón oro", "Planificación central", "Poder adquisitivo", "Precios",
+    "Preferencia temporal", "Praxeología", "Privatización", "Producción", "Proteccionismo", "Punto de equilibrio",
+    "Racionamiento", "Recesión", "Riesgo moral", "Salarios", "Satisfacción de necesidades", "Sector privado",
+    "Sector público", "Selección natural económica", "Socialismo", "Soberanía del consumidor", "Subjetivismo",
+    "Tasa de interés natural", "Teorema de la imposibilidad del socialismo", "Teorema de regresión",
+    "Teoría austriaca del ciclo económico", "Teoría del valor subjetivo", "Tiempo", "Tipos de interés",
+    "Utilidad marginal", "Valor", "Valor presente", "Velocidad de circulación del dinero", "Ventaja comparativa",
+    "Voluntarismo"
+])
+
+# 101 economic terms related to the Austrian school of economics
+# (serplyapp.py y el lote de serplyall.py)
+TERMINOS_EXTENDIDOS = sorted([
+    "Acción Humana", "Ahorro", "Aranceles", "Armonía Económica", "Avería", "Banco Central",
+    "Bienes de Capital", "Bienes Intermedios", "Bienes de Consumo", "Capitalismo", "Competencia",
+    "Competencia Monopolística", "Competencia Perfecta", "Conocimiento", "Costo de Oportunidad",
+    "Crédito", "Crecimiento Económico", "Ciclo Económico", "Deflación", "Demanda", "División del Trabajo",
+    "Doble Coincidencia de Deseos", "Eficiencia", "Elasticidad", "Emprendimiento", "Equilibrio Económico",
+    "Especialización", "Espontaneidad", "Esperanza de Vida", "Estado de Derecho", "Externalidades",
+    "Factor de Producción", "Federalismo", "Fiduciario", "Función Empresarial", "Futuro", "Gasto Público",
+    "Inflación", "Instituciones", "Interés", "Inversión", "Intervencionismo", "Libre Mercado",
+    "Mecanismo de Precios", "Mercado", "Microeconomía", "Modelo de Competencia", "Moneda",
+    "Monopolio", "Oferta", "Orden Espontáneo", "Paradigma", "Pareto", "Plusvalía", "Poder Adquisitivo",
+    "Política Económica", "Ponderación", "Precio", "Preferencia de Tiempo", "Preferencias", "Producción",
+    "Productividad", "Propiedad Privada", "Proteccionismo", "Racionalidad", "Recurso Económico",
+    "Redistribución de la Riqueza", "Regulación", "Renta", "Riesgo", "Sector Público", "Sector Privado",
+    "Seguridad Jurídica", "Servicio", "Sistema Económico", "Soberanía del Consumidor", "Sociedad Abierta",
+    "Subsidio", "Sujeto Económico", "Tasa de Interés", "Teoría del Ciclo Económico", "Trabajo", "Valor",
+    "Valor de Uso", "Valor del Cambio", "Ventaja Competitiva", "Ventaja Comparativa", "Verosimilitud",
+    "Voluntad Individual", "Bienes Públicos", "Economía de Escala", "Heterogénea del Capital",
+    "Cálculo Económico", "Teoría del Capital", "Preferencia Temporal", "Productividad Marginal",
+    "Interés Natural", "Subsidiaridad", "Humano Acción", "Reconstrucción" 
+])
+
+# Lista de términos y tesis socialistas/marxistas
+TERMINOS_SOCIALISTAS = [
+    "Lucha de clases", "Plusvalía", "Alienación", "Materialismo histórico", "Dictadura del proletariado",
+    "Modo de producción", "Socialismo científico", "Revolución proletaria", "Conciencia de clase",
+    "Imperialismo", "Capital constante y variable", "Fetichismo de la mercancía", "Acumulación primitiva",
+    "Ejército industrial de reserva", "Superestructura e infraestructura", "Socialización de los medios de producción",
+    "Teoría del valor-trabajo", "Contradicciones del capitalismo", "Comunismo primitivo",
+    "Internacionalismo proletario", "Determinismo económico", "Dialéctica materialista",
+    "Explotación laboral", "Pauperización", "Concentración del capital"
+]
+
+# Columna de información de app.py
+INFO_AUTORES = """
+## Sobre esta aplicación
+
+Esta aplicación es un Diccionario Económico basado en el pensamiento de la Escuela Austríaca de Economía. Permite a los usuarios obtener definiciones de términos económicos según la interpretación de diversos autores de esta escuela.
+
+### Cómo usar la aplicación:
+
+1. Elija un término económico de la lista predefinida o proponga su propio término.
+2. Seleccione uno o más autores de la Escuela Austríaca de Economía.
+3. Haga clic en "Obtener definición" para generar las definiciones.
+4. Lea las definiciones y fuentes proporcionadas.
+5. Si lo desea, descargue un documento DOCX con toda la información.
+
+### Autor y actualización:
+**Moris Polanco**, 26 ag 2024
+
+### Cómo citar esta aplicación (formato APA):
+Polanco, M. (2024). *Diccionario Económico de la Escuela Austríaca* [Aplicación web]. https://dicaustriaca.streamlit.app
+
+---
+**Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en información disponible en línea. Siempre verifique la información con fuentes académicas para un análisis más profundo.
+"""
+
+# Columna de información de serply.py
+INFO_ESCUELA_AUSTRIACA = """
+## Sobre esta aplicación
+
+Esta aplicación es un Diccionario de Economía basado en la visión de la Escuela Austríaca. Permite a los usuarios obtener definiciones de términos económicos según la interpretación de esta escuela de pensamiento.
+
+### Cómo usar la aplicación:
+
+1. Elija si desea seleccionar un término de la lista predefinida o proponer su propio término.
+2. Seleccione o ingrese el término económico de interés.
+3. Haga clic en "Generar entrada de diccionario" para obtener la definición desde la perspectiva de la Escuela Austríaca.
+4. Lea la definición y las fuentes proporcionadas.
+5. Si lo desea, descargue un documento DOCX con toda la información.
+
+### Autor y actualización:
+**Moris Polanco**, 28 ag 2024
+
+### Cómo citar esta aplicación (formato APA):
+Polanco, M. (2024). *Diccionario de Economía Austríaca* [Aplicación web]. https://economiaaustriaca.streamlit.app
+
+---
+**Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en la visión de la Escuela Austríaca. Verifique la información con fuentes adicionales para un análisis más profundo.
+"""
+
+# Columna de información de serplyapp.py
+INFO_EXTENDIDO = """
+## Sobre esta aplicación
+
+Esta aplicación es un Diccionario Económico basado en la perspectiva de la Escuela Austríaca de Economía. Permite a los usuarios obtener definiciones de términos económicos según esta interpretación.
+
+### Cómo usar la aplicación:
+
+1. Elija un término económico de la lista predefinida o ingrese su propio término.
+2. Haga clic en "Generar entrada de diccionario" para obtener la definición desde la perspectiva de la escuela austríaca.
+3. Lea la definición y las fuentes proporcionadas.
+4. Si lo desea, descargue un documento DOCX con toda la información.
+
+### Autor y actualización:
+**Moris Polanco**, 28 ag 2024
+
+### Cómo citar esta aplicación (formato APA):
+Polanco, M. (2024). *Diccionario Económico Austríaco* [Aplicación web]. https://escuelaaustriaca.streamlit.app
+
+---
+**Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en la visión de la escuela austríaca. Verifique la información con fuentes adicionales para un análisis más profundo.
+"""
+
+# Columna de información de serplyall.py
+INFO_LOTE = """
+## Sobre esta aplicación
+
+Esta aplicación es un Diccionario Económico basado en la perspectiva de la Escuela Austríaca de Economía. Permite a los usuarios obtener definiciones de términos económicos según esta interpretación.
+
+### Cómo usar la aplicación:
+
+1. Elija un término económico de la lista predefinida o ingrese su propio término.
+2. Haga clic en "Generar entrada de diccionario" para obtener la definición desde la perspectiva de la escuela austríaca.
+3. Lea la definición y las fuentes proporcionadas.
+4. Si lo desea, descargue un documento DOCX con toda la información.
+
+### Autor y actualización:
+**Moris Polanco**, 28 ag 2024
+
+### Cómo citar esta aplicación (formato APA):
+Polanco, M. (2024). *Diccionario Económico Austríaco* [Aplicación web]. https://economiaaustriaca.streamlit.app
+
+---
+**Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en la visión de la escuela austríaca. Verifique la información con fuentes adicionales para un análisis más profundo.
+"""
+
+# Columna de información de refutaciones.py
+INFO_REFUTACIONES = """
+## Sobre esta aplicación
+
+Esta aplicación es un Diccionario de Términos Socialistas y Marxistas con Refutaciones desde una perspectiva filosófica y general. Permite a los usuarios obtener definiciones de términos económicos socialistas o marxistas y sus correspondientes críticas desde un punto de vista amplio y fundamentado.
+
+### Cómo usar la aplicación:
+
+1. Elige un término o tesis socialista/marxista de la lista predefinida o propón tu propio término.
+2. Haz clic en "Obtener definición y refutación" para generar el contenido.
+3. Lee la definición y la refutación filosófica proporcionada.
+4. Si lo deseas, descarga un documento DOCX con toda la información.
+
+### Autor y actualización:
+**Moris Polanco**, [Fecha actual]
+
+### Cómo citar esta aplicación (formato APA):
+Polanco, M. ([Año actual]). *Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas* [Aplicación web]. [URL de la aplicación]
+
+---
+**Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones y refutaciones basadas en información disponible en línea. Siempre verifica la información con fuentes académicas para un análisis más profundo.
+"""
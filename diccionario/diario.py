@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+import time
+
+from diccionario.cache import a_json
+
+
+# Diario de solo adición (JSONL) para los lotes largos. Cada término terminado
+# o fallido se escribe y se sincroniza en disco en cuanto se conoce, de modo
+# que tras un fallo o un rerun de Streamlit el lote se reanuda desde el último
+# punto de control y sólo se reintentan los términos pendientes o fallidos.
+class DiarioLote:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+
+    # Último registro de cada término. Las líneas incompletas (p. ej. cortadas
+    # por una caída a mitad de escritura) se ignoran.
+    def cargar(self):
+        registros = {}
+        if not os.path.exists(self.ruta):
+            return registros
+        with open(self.ruta, encoding="utf-8") as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+                # Los pares (termino, autor) se guardan como listas en JSON
+                termino = registro["termino"]
+                registros[tuple(termino) if isinstance(termino, list) else termino] = registro
+        return registros
+
+    def completados(self):
+        return {
+            termino: (registro["definicion"], registro["fuentes"])
+            for termino, registro in self.cargar().items() if registro["estado"] == "completado"
+        }
+
+    def fallidos(self):
+        return {
+            termino: registro["error"]
+            for termino, registro in self.cargar().items() if registro["estado"] == "fallido"
+        }
+
+    def registrar_completado(self, termino, definicion, fuentes):
+        self._escribir({"termino": termino, "estado": "completado", "definicion": definicion, "fuentes": fuentes})
+
+    def registrar_fallo(self, termino, error):
+        self._escribir({"termino": termino, "estado": "fallido", "error": str(error)})
+
+    def reiniciar(self):
+        with self._lock:
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+
+    def _escribir(self, registro):
+        registro["fecha"] = time.time()
+        linea = json.dumps(registro, ensure_ascii=False, default=a_json) + "\n"
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as archivo:
+                archivo.write(linea)
+                archivo.flush()
+                os.fsync(archivo.fileno())
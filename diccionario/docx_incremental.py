@@ -0,0 +1,130 @@
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# Escritor DOCX que genera el OOXML directamente en un zip en disco. El cuerpo
+# del documento (word/document.xml) se escribe en streaming párrafo a párrafo,
+# así que la memoria no crece con el número de entradas, a diferencia de
+# construir un `docx.Document` completo y guardarlo en un BytesIO.
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>'
+    '</Relationships>'
+)
+
+
+def _estilo_titulo(identificador, nombre, tamano, color="17365D"):
+    return (
+        f'<w:style w:type="paragraph" w:styleId="{identificador}"><w:name w:val="{nombre}"/>'
+        '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+        '<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="120"/></w:pPr>'
+        f'<w:rPr><w:b/><w:color w:val="{color}"/><w:sz w:val="{tamano}"/></w:rPr></w:style>'
+    )
+
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:styles xmlns:w="{_W}">'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+    '<w:pPr><w:spacing w:after="120"/></w:pPr><w:rPr><w:sz w:val="22"/></w:rPr></w:style>'
+    + _estilo_titulo("Title", "Title", 52)
+    + _estilo_titulo("Heading1", "heading 1", 32, "365F91")
+    + _estilo_titulo("Heading2", "heading 2", 26, "4F81BD")
+    + _estilo_titulo("Heading3", "heading 3", 22, "4F81BD")
+    + '<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/>'
+    '<w:basedOn w:val="Normal"/><w:pPr><w:numPr><w:numId w:val="1"/></w:numPr></w:pPr></w:style>'
+    '</w:styles>'
+)
+
+_NUMBERING = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:numbering xmlns:w="{_W}">'
+    '<w:abstractNum w:abstractNumId="0"><w:lvl w:ilvl="0"><w:start w:val="1"/>'
+    '<w:numFmt w:val="bullet"/><w:lvlText w:val="•"/><w:lvlJc w:val="left"/>'
+    '<w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl></w:abstractNum>'
+    '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+    '</w:numbering>'
+)
+
+# Caracteres de control que no son válidos en XML 1.0
+_NO_VALIDOS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _runs(texto):
+    lineas = _NO_VALIDOS.sub("", str(texto)).split("\n")
+    return "<w:r>" + "<w:br/>".join(f'<w:t xml:space="preserve">{escape(linea)}</w:t>' for linea in lineas) + "</w:r>"
+
+
+class EscritorDocx:
+    def __init__(self, ruta):
+        self._zip = zipfile.ZipFile(ruta, "w", compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _RELS)
+        self._zip.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        self._zip.writestr("word/styles.xml", _STYLES)
+        self._zip.writestr("word/numbering.xml", _NUMBERING)
+        self._cuerpo = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._escribir(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<w:document xmlns:w="{_W}"><w:body>'
+        )
+
+    def _escribir(self, xml):
+        self._cuerpo.write(xml.encode("utf-8"))
+
+    # Equivalentes de los métodos de python-docx que usan las aplicaciones
+    def add_heading(self, texto, level=1):
+        estilo = "Title" if level == 0 else f"Heading{level}"
+        self.add_paragraph(texto, style=estilo)
+
+    def add_paragraph(self, texto="", style=None):
+        estilo = f'<w:pPr><w:pStyle w:val="{style.replace(" ", "")}"/></w:pPr>' if style else ""
+        self._escribir(f"<w:p>{estilo}{_runs(texto)}</w:p>")
+
+    def add_page_break(self):
+        self._escribir('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    # Entrada del diccionario (ver exportadores): se escribe con disponer(doc)
+    def add_entry(self, entrada, disponer):
+        disponer(self)
+
+    def cerrar(self):
+        if self._cuerpo is None:
+            return
+        self._escribir(
+            '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+            '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>'
+            '</w:sectPr></w:body></w:document>'
+        )
+        self._cuerpo.close()
+        self._cuerpo = None
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
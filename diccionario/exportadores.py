@@ -0,0 +1,161 @@
+import html
+import io
+import json
+import os
+
+from diccionario import metricas
+from diccionario.cache import a_json
+from diccionario.docx_incremental import EscritorDocx
+
+# Escritores de documentos con la misma interfaz que usan las aplicaciones con
+# python-docx (add_heading, add_paragraph, add_page_break) más `add_entry` y
+# `cerrar()`. Todos escriben en streaming sobre una ruta o un archivo binario
+# (p. ej. un BytesIO), así que las funciones que construyen el documento sirven
+# para cualquier formato y sólo el DOCX paga el coste de generar OOXML.
+#
+# add_entry(entrada, disponer) escribe una entrada del diccionario: `entrada`
+# es su registro ({"termino", "definicion", "fuentes", ...}) y disponer(doc)
+# la escribe con títulos y párrafos. Los formatos de lectura la disponen; el
+# JSONL guarda sólo el registro.
+
+
+class _EscritorTexto:
+    def __init__(self, destino):
+        if isinstance(destino, (str, os.PathLike)):
+            self._archivo = open(destino, "w", encoding="utf-8", newline="\n")
+            self._propio = True
+        else:
+            self._archivo = io.TextIOWrapper(destino, encoding="utf-8", newline="\n")
+            self._propio = False
+        self._iniciar()
+
+    def _iniciar(self):
+        pass
+
+    def _terminar(self):
+        pass
+
+    def add_page_break(self):
+        pass
+
+    def add_entry(self, entrada, disponer):
+        disponer(self)
+
+    def cerrar(self):
+        if self._archivo is None:
+            return
+        self._terminar()
+        if self._propio:
+            self._archivo.close()
+        else:
+            # El archivo del llamador queda abierto (p. ej. para leer un BytesIO)
+            self._archivo.flush()
+            self._archivo.detach()
+        self._archivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class EscritorMarkdown(_EscritorTexto):
+    def add_heading(self, texto, level=1):
+        self._archivo.write(f"{'#' * (level + 1)} {texto}\n\n")
+
+    def add_paragraph(self, texto="", style=None):
+        texto = str(texto).strip("\n")
+        if style == "List Bullet":
+            self._archivo.write(f"- {texto}\n\n")
+        else:
+            self._archivo.write(f"{texto}\n\n")
+
+    def add_page_break(self):
+        self._archivo.write("---\n\n")
+
+
+class EscritorHtml(_EscritorTexto):
+    def _iniciar(self):
+        self._en_lista = False
+        self._archivo.write('<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n'
+                            '<style>body{font-family:sans-serif;max-width:48em;margin:2em auto;line-height:1.5}</style>\n'
+                            '</head>\n<body>\n')
+
+    def _cerrar_lista(self):
+        if self._en_lista:
+            self._archivo.write("</ul>\n")
+            self._en_lista = False
+
+    def add_heading(self, texto, level=1):
+        self._cerrar_lista()
+        etiqueta = f"h{min(level + 1, 6)}"
+        self._archivo.write(f"<{etiqueta}>{html.escape(str(texto))}</{etiqueta}>\n")
+
+    def add_paragraph(self, texto="", style=None):
+        contenido = html.escape(str(texto).strip("\n")).replace("\n", "<br>\n")
+        if style == "List Bullet":
+            if not self._en_lista:
+                self._archivo.write("<ul>\n")
+                self._en_lista = True
+            self._archivo.write(f"<li>{contenido}</li>\n")
+        else:
+            self._cerrar_lista()
+            self._archivo.write(f"<p>{contenido}</p>\n")
+
+    def add_page_break(self):
+        self._cerrar_lista()
+        self._archivo.write("<hr>\n")
+
+    def _terminar(self):
+        self._cerrar_lista()
+        self._archivo.write("</body>\n</html>\n")
+
+
+# Un objeto JSON por entrada, en orden, con los campos de su registro:
+#   {"termino": "...", "definicion": "...", "fuentes": [...]}
+# (refutaciones.py añade "refutacion"; app.py da "definiciones" por autor).
+# Los títulos, párrafos y saltos fuera de las entradas (encabezado y nota)
+# son sólo presentación y no se escriben.
+class EscritorJsonl(_EscritorTexto):
+    def add_heading(self, texto, level=1):
+        pass
+
+    def add_paragraph(self, texto="", style=None):
+        pass
+
+    def add_entry(self, entrada, disponer):
+        self._archivo.write(json.dumps(entrada, ensure_ascii=False, default=a_json) + "\n")
+
+
+FORMATOS = {
+    "docx": {"nombre": "DOCX", "extension": ".docx", "escritor": EscritorDocx,
+             "mime": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"},
+    "md": {"nombre": "Markdown", "extension": ".md", "escritor": EscritorMarkdown, "mime": "text/markdown"},
+    "html": {"nombre": "HTML", "extension": ".html", "escritor": EscritorHtml, "mime": "text/html"},
+    "jsonl": {"nombre": "JSONL", "extension": ".jsonl", "escritor": EscritorJsonl, "mime": "application/jsonl"},
+}
+
+
+def crear_escritor(formato, destino):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return FORMATOS[formato]["escritor"](destino)
+
+
+# Formato que corresponde a la extensión de `ruta` (DOCX si no se reconoce)
+def formato_de_ruta(ruta):
+    extension = os.path.splitext(ruta)[1].lower()
+    for formato, datos in FORMATOS.items():
+        if datos["extension"] == extension:
+            return formato
+    return "docx"
+
+
+# Ejecuta escribir(doc, *args) sobre un escritor en memoria y devuelve los bytes
+def exportar_bytes(formato, escribir, *args):
+    buffer = io.BytesIO()
+    with metricas.medir("exportacion", formato=formato):
+        with crear_escritor(formato, buffer) as doc:
+            escribir(doc, *args)
+    return buffer.getvalue()
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+
+from diccionario import metricas
+from diccionario.concurrencia import ejecutar_en_paralelo
+
+# Generación agrupada de glosarios: varias entradas cortas en una sola
+# solicitud al LLM, con las instrucciones una única vez y la respuesta en JSON
+# (un objeto por entrada). Las entradas que faltan en la respuesta o no se
+# pueden leer se vuelven a generar una a una.
+
+# Entradas por solicitud; con más, la respuesta se acerca al límite de tokens del modelo
+TAMANO_GRUPO = 5
+# Tokens de contexto de búsqueda por entrada dentro de una solicitud agrupada
+PRESUPUESTO_CONTEXTO = int(os.environ.get("DICCIONARIO_PRESUPUESTO_CONTEXTO_GLOSARIO", 384))
+# Tokens de respuesta reservados por entrada
+TOKENS_POR_ENTRADA = 500
+
+
+# `campos` es {campo: descripción} de cada entrada; `elementos` son (descripcion, contexto) ya recortados
+def prompt_grupo(instrucciones, campos, elementos):
+    bloques = "\n\n".join(
+        f"[{i}] {descripcion}\nContexto: {contexto}"
+        for i, (descripcion, contexto) in enumerate(elementos, 1)
+    )
+    formato = json.dumps([{"id": 1, **campos}], ensure_ascii=False)
+    return f"""{instrucciones}
+
+Redacta una entrada para cada uno de estos {len(elementos)} elementos, usando su contexto:
+
+{bloques}
+
+Responde únicamente con un array JSON con un objeto por elemento, en el mismo orden y con su número en "id", con este formato:
+{formato}
+
+JSON:"""
+
+
+# Objetos JSON de primer nivel en `texto`. Se toleran el texto alrededor y un
+# array cortado por el límite de tokens (se aprovechan los objetos completos).
+def _objetos_json(texto):
+    decodificador = json.JSONDecoder()
+    posicion = texto.find("{")
+    while posicion != -1:
+        try:
+            objeto, fin = decodificador.raw_decode(texto, posicion)
+        except json.JSONDecodeError:
+            posicion = texto.find("{", posicion + 1)
+            continue
+        if isinstance(objeto, dict):
+            yield objeto
+        posicion = texto.find("{", fin)
+
+
+# {id: {campo: valor}} de los objetos de la respuesta con un id entre 1 y
+# `total` y todos los campos como texto no vacío
+def separar_respuesta(texto, total, campos):
+    registros = {}
+    for objeto in _objetos_json(texto):
+        try:
+            id_elemento = int(objeto.get("id"))
+        except (TypeError, ValueError):
+            continue
+        valores = [objeto.get(campo) for campo in campos]
+        if 1 <= id_elemento <= total and id_elemento not in registros and all(isinstance(v, str) and v.strip() for v in valores):
+            registros[id_elemento] = {campo: valor.strip() for campo, valor in zip(campos, valores)}
+    return registros
+
+
+# Genera las entradas de `elementos` [(clave, descripcion, contexto)] con
+# `llm` en grupos de `tamano_grupo` (hasta `max_concurrencia` grupos a la vez,
+# con `tokens_por_entrada` tokens de respuesta por entrada; `opciones` son los
+# parámetros de `llm.completar`). Las que no llegan en la respuesta agrupada
+# se generan con generar_una(clave, contexto), que devuelve {campo: valor}.
+# contexto(presupuesto=...) da el contexto de búsqueda de cada elemento con
+# ese presupuesto de tokens (p. ej. ResultadoBusqueda.contexto): en los grupos
+# se limita a PRESUPUESTO_CONTEXTO y la generación individual usa el habitual.
+# al_progresar(hechas, total) se llama tras cada entrada.
+# Devuelve ({clave: {campo: valor}}, {clave: error}) en el orden de `elementos`.
+def generar_agrupado(llm, instrucciones, campos, elementos, generar_una, tamano_grupo=TAMANO_GRUPO,
+                     tokens_por_entrada=TOKENS_POR_ENTRADA, max_concurrencia=4, al_progresar=None, **opciones):
+    elementos = list(elementos)
+    grupos = [elementos[i:i + tamano_grupo] for i in range(0, len(elementos), tamano_grupo)]
+    entradas, fallidos = {}, {}
+    lock = threading.Lock()
+
+    def terminar(clave, entrada=None, error=None):
+        with lock:
+            if error is None:
+                entradas[clave] = entrada
+            else:
+                fallidos[clave] = error
+            hechas = len(entradas) + len(fallidos)
+        if al_progresar:
+            al_progresar(hechas, len(elementos))
+
+    def reintentar(elemento):
+        clave, _, contexto = elemento
+        try:
+            terminar(clave, generar_una(clave, contexto()))
+        except Exception as e:
+            terminar(clave, error=str(e))
+
+    def procesar_grupo(grupo):
+        registros = {}
+        # Un grupo de un solo elemento se genera directamente con su prompt habitual
+        if len(grupo) > 1:
+            prompt = prompt_grupo(instrucciones, campos, [(descripcion, contexto(presupuesto=PRESUPUESTO_CONTEXTO))
+                                                          for _, descripcion, contexto in grupo])
+            try:
+                # Sin secuencias de parada: el JSON puede contener "Término:"
+                texto = llm.completar(prompt, max_tokens=tokens_por_entrada * len(grupo), stop=[], **opciones)
+                registros = separar_respuesta(texto, len(grupo), campos)
+            except Exception:
+                # Si falla la solicitud agrupada, sus entradas se generan una a una
+                metricas.contar("glosario_grupos_fallidos")
+        metricas.contar("glosario_entradas", len(registros), modo="agrupada")
+        metricas.contar("glosario_entradas", len(grupo) - len(registros), modo="individual")
+        for i, (clave, _, _) in enumerate(grupo, 1):
+            if i in registros:
+                terminar(clave, registros[i])
+        pendientes = [elemento for i, elemento in enumerate(grupo, 1) if i not in registros]
+        ejecutar_en_paralelo(reintentar, pendientes, len(pendientes))
+
+    ejecutar_en_paralelo(procesar_grupo, grupos, max_concurrencia)
+    return (
+        {clave: entradas[clave] for clave, _, _ in elementos if clave in entradas},
+        {clave: fallidos[clave] for clave, _, _ in elementos if clave in fallidos},
+    )
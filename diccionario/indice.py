@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from diccionario.cache import a_json, normalizar_clave
+
+# Similitud mínima de nombre para proponer una entrada existente en lugar de generar una nueva.
+UMBRAL_SIMILITUD = float(os.environ.get("DICCIONARIO_UMBRAL_SIMILITUD", 0.6))
+
+# Segundos que una escritura espera a que otro proceso (p. ej. generar_diccionario.py
+# mientras las aplicaciones sirven el índice) libere la base de datos.
+ESPERA_BLOQUEO = float(os.environ.get("DICCIONARIO_ESPERA_BLOQUEO", 30))
+
+# Artefacto precalculado con las entradas de los términos predefinidos.
+# Se genera con generar_diccionario.py (una --coleccion por aplicación, o el
+# modo batch de serplyall.py) y se distribuye junto a las aplicaciones.
+RUTA_INDICE = os.environ.get("DICCIONARIO_INDICE", os.path.join(os.path.dirname(os.path.dirname(__file__)), "indice_diccionario.sqlite"))
+
+
+# Índice local de entradas ya generadas. Cada aplicación usa su propia
+# `coleccion` (el prompt y la búsqueda difieren entre ellas); `autor` queda
+# vacío cuando la entrada no depende de un autor concreto.
+class IndiceDiccionario:
+    def __init__(self, ruta=RUTA_INDICE):
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, timeout=ESPERA_BLOQUEO, check_same_thread=False, isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS entradas ("
+            "coleccion TEXT NOT NULL, clave TEXT NOT NULL, autor TEXT NOT NULL, "
+            "termino TEXT NOT NULL, definicion TEXT NOT NULL, fuentes TEXT NOT NULL, "
+            "PRIMARY KEY (coleccion, clave, autor))"
+        )
+        self._conexion.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS entradas_fts USING fts5("
+            "coleccion UNINDEXED, clave UNINDEXED, autor UNINDEXED, termino, definicion, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def obtener(self, coleccion, termino, autor=""):
+        with self._lock:
+            fila = self._conexion.execute(
+                # Las entradas vacías de lotes anteriores cuentan como ausentes y se regeneran
+                "SELECT termino, definicion, fuentes FROM entradas WHERE coleccion = ? AND clave = ? AND autor = ? AND definicion != ''",
+                (coleccion, normalizar_clave(termino), autor),
+            ).fetchone()
+        if fila is None:
+            return None
+        return {"termino": fila[0], "definicion": fila[1], "fuentes": json.loads(fila[2])}
+
+    def guardar(self, coleccion, termino, definicion, fuentes, autor=""):
+        clave = normalizar_clave(termino)
+        with self._lock:
+            # IMMEDIATE toma el bloqueo de escritura al empezar, donde se aplica la espera
+            # de ESPERA_BLOQUEO; si algo falla se deshace para no dejar la conexión
+            # compartida dentro de una transacción abierta.
+            self._conexion.execute("BEGIN IMMEDIATE")
+            try:
+                self._conexion.execute(
+                    "INSERT OR REPLACE INTO entradas (coleccion, clave, autor, termino, definicion, fuentes) VALUES (?, ?, ?, ?, ?, ?)",
+                    (coleccion, clave, autor, termino, definicion, json.dumps(fuentes, ensure_ascii=False, default=a_json)),
+                )
+                self._conexion.execute(
+                    "DELETE FROM entradas_fts WHERE coleccion = ? AND clave = ? AND autor = ?", (coleccion, clave, autor)
+                )
+                self._conexion.execute(
+                    "INSERT INTO entradas_fts (coleccion, clave, autor, termino, definicion) VALUES (?, ?, ?, ?, ?)",
+                    (coleccion, clave, autor, termino, definicion),
+                )
+                self._conexion.execute("COMMIT")
+            except BaseException:
+                if self._conexion.in_transaction:
+                    self._conexion.execute("ROLLBACK")
+                raise
+
+    # Entradas existentes parecidas a `termino`, para proponerlas antes de
+    # generar una nueva. Son candidatas las que contienen en su nombre todas las
+    # palabras significativas de `termino` según el índice de texto completo
+    # ("Tasa de interés" -> "Tasa de interés natural"), ordenadas por BM25, y
+    # después las que se le parecen por trigramas del nombre (sin acentos,
+    # artículos ni orden de palabras: "Humano Acción" -> "Acción Humana"),
+    # ordenadas por similitud. Devuelve una lista de (puntuacion, entrada), con
+    # la similitud de trigramas como puntuación.
+    def buscar_similares(self, coleccion, termino, autor="", limite=3, minimo=UMBRAL_SIMILITUD):
+        consulta = trigramas(termino)
+        if not consulta:
+            return []
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT clave, termino, definicion, fuentes FROM entradas WHERE coleccion = ? AND autor = ? AND definicion != ''",
+                (coleccion, autor),
+            ).fetchall()
+        puntuaciones = {fila[0]: similitud(consulta, trigramas(fila[1])) for fila in filas}
+        orden = {clave: posicion for posicion, clave in enumerate(self._buscar_texto(coleccion, termino, autor, limite))}
+        candidatos = sorted(
+            (fila for fila in filas if fila[0] in orden or puntuaciones[fila[0]] >= minimo),
+            key=lambda fila: (orden.get(fila[0], len(orden)), -puntuaciones[fila[0]])
+        )
+        return [
+            (puntuaciones[fila[0]], {"termino": fila[1], "definicion": fila[2], "fuentes": json.loads(fila[3])})
+            for fila in candidatos[:limite]
+        ]
+
+    # Claves de las entradas cuyo nombre contiene todas las palabras
+    # significativas de `termino`, de más a menos relevante según BM25.
+    def _buscar_texto(self, coleccion, termino, autor, limite):
+        palabras = [palabra for palabra in re.findall(r"\w+", normalizar_clave(termino)) if palabra not in PALABRAS_VACIAS]
+        if not palabras:
+            return []
+        consulta = "termino : (" + " AND ".join(f'"{palabra}"' for palabra in palabras) + ")"
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT clave FROM entradas_fts WHERE entradas_fts MATCH ? AND coleccion = ? AND autor = ? "
+                "ORDER BY bm25(entradas_fts, 0, 0, 0, 10.0, 1.0) LIMIT ?",
+                (consulta, coleccion, autor, limite),
+            ).fetchall()
+        return [fila[0] for fila in filas]
+
+    def terminos(self, coleccion):
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT DISTINCT termino FROM entradas WHERE coleccion = ?", (coleccion,)
+            ).fetchall()
+        return [fila[0] for fila in filas]
+
+
+# Artículos y preposiciones que no distinguen un término de otro.
+PALABRAS_VACIAS = {"a", "al", "de", "del", "el", "en", "la", "las", "lo", "los", "por", "un", "una", "y"}
+
+
+# Conjunto de trigramas de un término; las palabras se ordenan para que el
+# orden en que se escriben no afecte a la comparación.
+def trigramas(texto):
+    palabras = sorted(p for p in re.findall(r"\w+", normalizar_clave(texto)) if p not in PALABRAS_VACIAS)
+    resultado = set()
+    for palabra in palabras:
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+# Coeficiente de Jaccard entre dos conjuntos de trigramas.
+def similitud(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+# Índice compartido por todo el proceso.
+def obtener_indice():
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceDiccionario()
+        return _indice
+
+
+# Nombres de las entradas de `coleccion` parecidos a un término propio (para
+# cualquiera de `autores`), en el orden de `buscar_similares`. No se devuelve
+# ninguno si el término ya tiene entrada. Son sólo propuestas que el usuario
+# confirma: nombres muy parecidos pueden ser conceptos distintos u opuestos
+# ("Competencia perfecta" e "imperfecta", "Eficiencia" y "Deficiencia").
+def sugerir_terminos(coleccion, termino, autores=("",)):
+    indice = obtener_indice()
+    if any(indice.obtener(coleccion, termino, autor) for autor in autores):
+        return []
+    sugerencias = []
+    for autor in autores:
+        for _, entrada in indice.buscar_similares(coleccion, termino, autor):
+            if entrada["termino"] not in sugerencias:
+                sugerencias.append(entrada["termino"])
+    return sugerencias
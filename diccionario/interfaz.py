@@ -0,0 +1,320 @@
+import os
+from functools import partial
+
+import streamlit as st
+
+from diccionario import metricas
+from diccionario.cache import huella
+from diccionario.concurrencia import ejecutar_en_paralelo
+from diccionario.exportadores import FORMATOS, exportar_bytes
+from diccionario.glosario import generar_agrupado
+from diccionario.indice import obtener_indice, sugerir_terminos
+from diccionario.trabajos import obtener_registro
+
+# Piezas de interfaz de Streamlit que comparten las aplicaciones.
+
+
+# El documento se renderiza una vez por (formato, función de escritura, huella del contenido);
+# los reruns y las descargas repetidas reutilizan los bytes. Los argumentos con "_" no forman parte de la clave.
+@st.cache_data(max_entries=64, show_spinner=False)
+def _renderizar(formato, escritor, huella_contenido, _escribir, _contenido):
+    return exportar_bytes(formato, _escribir, *_contenido)
+
+
+# Selector de formato y botón de descarga del documento que produce escribir(doc, *contenido)
+def boton_descarga(etiqueta, nombre_archivo, escribir, *contenido):
+    formato = st.selectbox("Formato de descarga:", list(FORMATOS), format_func=lambda f: FORMATOS[f]["nombre"])
+    st.download_button(
+        label=f"{etiqueta} en {FORMATOS[formato]['nombre']}",
+        data=_renderizar(formato, f"{escribir.__module__}.{escribir.__qualname__}", huella(contenido), escribir, contenido),
+        file_name=f"{nombre_archivo.replace(' ', '_')}{FORMATOS[formato]['extension']}",
+        mime=FORMATOS[formato]["mime"]
+    )
+
+
+# Elección entre la lista de términos y un término propio. Devuelve
+# (termino, predefinido, sugerir_similares).
+def elegir_termino(terminos, etiqueta_propio="Ingresa tu propio término económico:"):
+    opcion = st.radio("", ["Elegir de la lista", "Proponer mi propio término"])
+    sugerir_similares = True
+    if opcion == "Elegir de la lista":
+        termino = st.selectbox("Selecciona un término:", terminos)
+    else:
+        termino = st.text_input(etiqueta_propio)
+        # Antes de generar se proponen las entradas existentes con un nombre parecido
+        sugerir_similares = st.checkbox("Proponer entradas existentes con un nombre parecido", value=True)
+    return termino, opcion == "Elegir de la lista", sugerir_similares
+
+
+# Botón que pide la entrada de `termino`. Un término propio con entradas de
+# nombre parecido en `coleccion` (para alguno de `autores`; ver
+# indice.sugerir_terminos) no se genera directamente: se proponen esas
+# entradas y el usuario elige una o confirma el término nuevo. Devuelve
+# (termino, predefinido) cuando hay que servir o generar la entrada, o None;
+# una entrada existente elegida cuenta como predefinida. `completo` indica si
+# la selección permite generar (por defecto, que haya término).
+def pedir_termino(etiqueta, coleccion, termino, predefinido, sugerir_similares, autores=("",), completo=None,
+                  aviso="Por favor, selecciona o ingresa un término."):
+    clave = "sugerencias_termino"
+    pedido = None
+    # Las propuestas de otro término ya no se muestran
+    if clave in st.session_state and st.session_state[clave][0] != termino:
+        del st.session_state[clave]
+
+    if st.button(etiqueta):
+        st.session_state.pop(clave, None)
+        sugerencias = []
+        if not (bool(termino) if completo is None else completo):
+            st.warning(aviso)
+        else:
+            if not predefinido and sugerir_similares:
+                sugerencias = sugerir_terminos(coleccion, termino, autores)
+            if sugerencias:
+                st.session_state[clave] = (termino, sugerencias)
+            else:
+                pedido = termino, predefinido
+
+    if clave in st.session_state:
+        propio, sugerencias = st.session_state[clave]
+        marco = st.empty()
+        with marco.container():
+            st.info(f"Ya hay entradas con un nombre parecido a «{propio}». Un nombre parecido puede ser otro concepto: usa una de ellas o genera una entrada nueva.")
+            for sugerencia in sugerencias:
+                if st.button(f"Usar «{sugerencia}»", key=f"{clave}_{sugerencia}"):
+                    pedido = sugerencia, True
+            if st.button(f"Generar «{propio}»", key=f"{clave}_nuevo"):
+                pedido = propio, False
+        # Elegida una opción, las propuestas desaparecen
+        if pedido:
+            del st.session_state[clave]
+            marco.empty()
+    return pedido
+
+
+# Envía funcion(trabajo, *args) al registro de trabajos en segundo plano y lo
+# asocia a la sesión con `clave`. El id se guarda también en la URL, de modo que
+# si el navegador se reconecta la nueva sesión recoge el mismo trabajo.
+def enviar_trabajo(clave, funcion, *args, descripcion="", clave_trabajo=None):
+    trabajo = obtener_registro().enviar(funcion, *args, descripcion=descripcion, clave=clave_trabajo)
+    st.session_state[clave] = trabajo.id
+    st.query_params[clave] = trabajo.id
+    return trabajo
+
+
+def _olvidar_trabajo(clave):
+    st.session_state.pop(clave, None)
+    if clave in st.query_params:
+        del st.query_params[clave]
+
+
+# Trabajo asociado a `clave` en la sesión (o en la URL). Mientras sigue en curso
+# se muestra con mostrar_progreso(trabajo) y se actualiza cada `intervalo`
+# segundos; un rerun (p. ej. al cambiar un widget) sólo interrumpe la espera,
+# no el trabajo. Devuelve el trabajo terminado, ya desasociado de la sesión, o
+# None si no hay ninguno.
+def recoger_trabajo(clave, mostrar_progreso, intervalo=0.25):
+    id_trabajo = st.session_state.get(clave) or st.query_params.get(clave)
+    trabajo = obtener_registro().obtener(id_trabajo) if id_trabajo else None
+    if trabajo is None:
+        if id_trabajo:
+            _olvidar_trabajo(clave)
+        return None
+    st.session_state[clave] = trabajo.id
+    marcador = st.empty()
+    while not trabajo.terminado:
+        with marcador.container():
+            mostrar_progreso(trabajo)
+        trabajo.esperar(intervalo)
+    marcador.empty()
+    _olvidar_trabajo(clave)
+    return trabajo
+
+
+# Trabajo en segundo plano de aplicacion_termino: busca, genera (con
+# `streaming`, el texto se acumula en el trabajo conforme llega) y guarda la
+# entrada en el índice. Devuelve (termino, definicion, fuentes).
+def _generar_entrada(trabajo, coleccion, buscador, generar_definicion, termino, predefinido, streaming):
+    resultado = buscador.buscar(termino)
+    if streaming:
+        for fragmento in generar_definicion(termino, resultado.contexto(termino), stream=True):
+            trabajo.agregar_texto(fragmento)
+        definicion = trabajo.parcial.strip()
+    else:
+        definicion = generar_definicion(termino, resultado.contexto(termino))
+    if definicion and predefinido:
+        obtener_indice().guardar(coleccion, termino, definicion, resultado.fuentes)
+    return termino, definicion, resultado.fuentes
+
+
+def _progreso_entrada(trabajo):
+    st.subheader(f"Definición para el término: {trabajo.descripcion}")
+    st.markdown(trabajo.parcial or "Buscando información y generando definición...")
+
+
+# Aplicación de una definición por término (serply.py y serplyapp.py): la
+# entrada se sirve desde el índice o se obtiene en segundo plano con `buscador`
+# y generar_definicion(termino, contexto, stream), y se ofrece para descargar
+# con escribir_documento(doc, termino, definicion, fuentes).
+def aplicacion_termino(terminos, coleccion, buscador, generar_definicion, escribir_documento, streaming=True):
+    st.write("Elige un término económico de la lista o propón tu propio término:")
+    termino, predefinido, sugerir_similares = elegir_termino(terminos)
+
+    pedido = pedir_termino("Generar entrada de diccionario", coleccion, termino, predefinido, sugerir_similares)
+    if pedido:
+        termino, predefinido = pedido
+        # Las entradas que ya están en el índice (p. ej. las precalculadas) se sirven sin llamar a las APIs
+        entrada = obtener_indice().obtener(coleccion, termino)
+        if entrada:
+            st.session_state["ultima_entrada"] = (termino, entrada["definicion"], entrada["fuentes"])
+        else:
+            enviar_trabajo("trabajo_entrada", _generar_entrada, coleccion, buscador, generar_definicion,
+                           termino, predefinido, streaming, descripcion=termino)
+
+    # La generación sigue aunque haya reruns; aquí se espera y se recoge su resultado
+    trabajo = recoger_trabajo("trabajo_entrada", _progreso_entrada)
+    if trabajo is not None:
+        if trabajo.error is not None:
+            st.error(str(trabajo.error))
+        else:
+            st.session_state["ultima_entrada"] = trabajo.resultado
+
+    # La entrada se conserva entre reruns (p. ej. al pulsar el botón de descarga)
+    if "ultima_entrada" in st.session_state:
+        termino, definicion, fuentes = st.session_state["ultima_entrada"]
+        st.subheader(f"Definición para el término: {termino}")
+        st.markdown(f"**{definicion}**")
+        boton_descarga("Descargar definición", f"Definicion_{termino}", escribir_documento, termino, definicion, fuentes)
+
+
+# Elección de varios términos de la lista y de términos propios (uno por
+# línea). Devuelve [(termino, predefinido)] sin repetidos.
+def elegir_terminos(terminos, etiqueta_propios="Términos propios (uno por línea):"):
+    seleccionados = st.multiselect("Términos de la lista:", terminos)
+    propios = [termino.strip() for termino in st.text_area(etiqueta_propios).splitlines() if termino.strip()]
+    elegidos = {}
+    for termino in [*seleccionados, *propios]:
+        elegidos.setdefault(termino, termino in terminos)
+    return list(elegidos.items())
+
+
+# Barra de progreso de un trabajo que informa (hechos, total, mensaje)
+def mostrar_progreso(trabajo):
+    hechos, total, mensaje = trabajo.progreso or (0, 0, "Buscando información...")
+    st.progress(hechos / total if total else 0.0, text=mensaje)
+
+
+# Trabajo en segundo plano de aplicacion_glosario. `claves` son términos o
+# pares (termino, autor). Devuelve ([(clave, entrada, fuentes)], {clave: error})
+# en el orden de `claves`.
+def _generar_glosario(trabajo, coleccion, buscador, llm, instrucciones, campos, generar_una, componer, separar, claves, opciones):
+    # Las entradas del glosario se guardan aparte de las de un término, que son más extensas
+    coleccion_glosario = f"{coleccion}_glosario"
+    entradas, fuentes, pendientes = {}, {}, []
+    # Las entradas que ya están en el índice (de un término o de otro glosario) no se vuelven a generar
+    indice = obtener_indice()
+    for clave, predefinido in claves:
+        partes = clave if isinstance(clave, tuple) else (clave,)
+        entrada = indice.obtener(coleccion, *partes) or indice.obtener(coleccion_glosario, *partes)
+        if entrada:
+            entradas[clave], fuentes[clave] = separar(entrada["definicion"]), entrada["fuentes"]
+        else:
+            pendientes.append((clave, partes, predefinido))
+    trabajo.informar(len(entradas), len(claves), "Buscando información...")
+
+    def buscar(partes):
+        try:
+            return buscador.buscar(*partes)
+        except Exception as e:
+            return e
+
+    # Todos los elementos pendientes en una sola búsqueda por lotes (una solicitud
+    # con Serper); si falla, cada uno se busca por separado para que un fallo no
+    # detenga el resto
+    lista_partes = [partes for _, partes, _ in pendientes]
+    try:
+        busquedas = buscador.buscar_lote(lista_partes) if pendientes else []
+    except Exception:
+        busquedas = ejecutar_en_paralelo(buscar, lista_partes, 8)
+    resultados = dict(zip([clave for clave, _, _ in pendientes], busquedas))
+    fallidos = {clave: str(r) for clave, r in resultados.items() if isinstance(r, Exception)}
+    # El contexto se recorta con el presupuesto de tokens de cada prompt (ver generar_agrupado)
+    elementos = [
+        (clave, "\n".join(f"{etiqueta}: {parte}" for etiqueta, parte in zip(("Término", "Autor"), partes)),
+         partial(resultados[clave].contexto, partes[0]))
+        for clave, partes, _ in pendientes if clave not in fallidos
+    ]
+    existentes = len(entradas)
+    generadas, fallidas = generar_agrupado(
+        llm, instrucciones, campos, elementos, generar_una,
+        al_progresar=lambda hechas, total: trabajo.informar(existentes + len(fallidos) + hechas, len(claves), "Generando entradas..."),
+        **opciones
+    )
+    fallidos.update(fallidas)
+    for clave, partes, predefinido in pendientes:
+        if clave in generadas:
+            entradas[clave], fuentes[clave] = generadas[clave], resultados[clave].fuentes
+            if predefinido:
+                indice.guardar(coleccion_glosario, partes[0], componer(generadas[clave]), fuentes[clave], *partes[1:])
+    return [(clave, entradas[clave], fuentes[clave]) for clave, _ in claves if clave in entradas], fallidos
+
+
+# Modo glosario de app.py, serply.py y refutaciones.py: varios términos a la
+# vez (o, con `autores`, cada término para cada autor, con claves (termino,
+# autor)), agrupados en solicitudes al LLM con respuesta JSON
+# (diccionario/glosario.py). `campos` es {campo: descripción} de cada entrada;
+# generar_una(clave, contexto) genera una entrada con el prompt individual
+# cuando no llega en la respuesta agrupada; componer(entrada) y separar(texto)
+# convierten la entrada al texto que se guarda en el índice (por defecto, el
+# único campo). mostrar_glosario(entradas) muestra y escribir_documento(doc,
+# entradas) escribe las entradas [(clave, entrada, fuentes)]. `opciones` van a
+# generar_agrupado.
+def aplicacion_glosario(terminos, coleccion, buscador, llm, instrucciones, campos, generar_una, mostrar_glosario, escribir_documento,
+                        componer=None, separar=None, etiqueta_propios="Términos propios (uno por línea):", autores=None, **opciones):
+    if componer is None:
+        campo, = campos
+        componer, separar = (lambda entrada: entrada[campo]), (lambda texto: {campo: texto})
+
+    st.write("Elige varios términos de la lista o escribe los tuyos:")
+    elegidos = elegir_terminos(terminos, etiqueta_propios)
+
+    if st.button("Generar glosario"):
+        if elegidos and autores != []:
+            claves = elegidos if autores is None else [((termino, autor), predefinido) for termino, predefinido in elegidos for autor in autores]
+            enviar_trabajo("trabajo_glosario", _generar_glosario, coleccion, buscador, llm, instrucciones, campos, generar_una,
+                           componer, separar, claves, opciones, descripcion=f"{len(elegidos)} términos")
+        elif autores is None:
+            st.warning("Por favor, selecciona o ingresa al menos un término.")
+        else:
+            st.warning("Por favor, selecciona al menos un término y un autor.")
+
+    trabajo = recoger_trabajo("trabajo_glosario", mostrar_progreso)
+    if trabajo is not None:
+        if trabajo.error is not None:
+            st.error(str(trabajo.error))
+        else:
+            entradas, fallidos = trabajo.resultado
+            for clave, error in fallidos.items():
+                nombre = f"{clave[0]} ({clave[1]})" if isinstance(clave, tuple) else clave
+                st.write(f"No se pudo procesar el término {nombre}: {error}")
+            # El glosario se conserva entre reruns (p. ej. al pulsar el botón de descarga)
+            st.session_state["ultimo_glosario"] = entradas
+
+    if st.session_state.get("ultimo_glosario"):
+        entradas = st.session_state["ultimo_glosario"]
+        mostrar_glosario(entradas)
+        boton_descarga("Descargar glosario", "Glosario", escribir_documento, entradas)
+
+
+# Panel oculto con los tiempos por etapa, los tokens y los aciertos de caché del
+# proceso. Se muestra con ?depuracion=1 en la URL o con DICCIONARIO_DEPURACION=1.
+# También arranca el endpoint de Prometheus si DICCIONARIO_METRICAS_PUERTO está definido.
+def panel_depuracion():
+    metricas.servir_desde_entorno()
+    if st.query_params.get("depuracion") != "1" and not os.environ.get("DICCIONARIO_DEPURACION"):
+        return
+    with st.expander("Depuración: tiempos, tokens y caché", expanded=True):
+        st.dataframe(metricas.METRICAS.resumen(), use_container_width=True)
+        st.caption("Últimas mediciones")
+        st.dataframe(metricas.METRICAS.recientes(), use_container_width=True)
+        if st.button("Reiniciar métricas"):
+            metricas.METRICAS.reiniciar()
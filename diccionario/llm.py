@@ -0,0 +1,78 @@
+import json
+import os
+import time
+
+from diccionario import cliente_http, metricas
+from diccionario.cache import completar_con_cache
+from diccionario.streaming import tokens_together, transmitir_con_cache
+
+MODELO = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+
+
+# Completados de texto con la API de inferencia de Together. Los parámetros de
+# muestreo por defecto son los de las aplicaciones; cada llamada puede
+# sobrescribirlos (p. ej. temperature=0.7, repetition_penalty=1).
+class Together:
+    URL = os.environ.get("DICCIONARIO_URL_TOGETHER", "https://api.together.xyz/inference")
+
+    def __init__(self, api_key, modelo=MODELO):
+        self.api_key = api_key
+        self.modelo = modelo
+
+    def parametros(self, prompt, **opciones):
+        return {
+            "model": self.modelo,
+            "prompt": prompt,
+            "max_tokens": 2048,
+            "temperature": 0,
+            "top_p": 0.7,
+            "top_k": 50,
+            "repetition_penalty": 0,
+            "stop": ["Término:"],
+            **opciones
+        }
+
+    def _headers(self):
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    def _llamar(self, parametros):
+        with metricas.medir("llm_generacion", modelo=self.modelo, modo="completo"):
+            response = cliente_http.post(self.URL, headers=self._headers(), data=json.dumps(parametros))
+        if response.status_code != 200:
+            raise RuntimeError(f"Error en la API de Together: {response.status_code} - {response.text}")
+        try:
+            datos = response.json()
+            texto = datos['output']['choices'][0]['text'].strip()
+        except (KeyError, IndexError) as e:
+            raise RuntimeError(f"Error al procesar la respuesta de la API de Together: {e}") from e
+        self._contar_tokens(datos.get("usage") or datos["output"].get("usage"))
+        return texto
+
+    def _contar_tokens(self, uso):
+        for tipo in ("prompt_tokens", "completion_tokens"):
+            if uso and uso.get(tipo):
+                metricas.contar("llm_tokens", uso[tipo], modelo=self.modelo, tipo=tipo)
+
+    # Sin `usage` en los eventos se cuenta un token por fragmento recibido
+    def _transmitir(self, parametros):
+        inicio = time.perf_counter()
+        with metricas.medir("llm_generacion", modelo=self.modelo, modo="stream"):
+            response = cliente_http.post(self.URL, headers=self._headers(), data=json.dumps({**parametros, "stream_tokens": True}), stream=True)
+            fragmentos = 0
+            for fragmento in tokens_together(response):
+                if not fragmentos:
+                    metricas.observar("llm_primer_token", time.perf_counter() - inicio, modelo=self.modelo)
+                fragmentos += 1
+                yield fragmento
+        metricas.contar("llm_tokens", fragmentos, modelo=self.modelo, tipo="completion_tokens")
+
+    # Devuelve el texto generado o, con `stream`, un iterador de fragmentos.
+    # Ver `completar_con_cache` para `usar_cache` (por defecto, sólo con temperatura 0).
+    def completar(self, prompt, stream=False, usar_cache=None, **opciones):
+        parametros = self.parametros(prompt, **opciones)
+        if stream:
+            return transmitir_con_cache(parametros, self._transmitir, usar_cache=usar_cache)
+        return completar_con_cache(parametros, lambda: self._llamar(parametros), usar_cache=usar_cache)
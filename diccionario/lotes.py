@@ -0,0 +1,173 @@
+import queue
+import threading
+
+_FIN = object()
+
+
+# Procesa los términos en dos etapas encadenadas (búsqueda -> generación),
+# cada una con su propio grupo de hilos y su propio limitador de tasa.
+# Entre ambas etapas hay una cola acotada, de modo que las búsquedas de
+# términos posteriores se solapan con la generación de los anteriores.
+#
+# Es un generador: produce tuplas (indice, termino, resultado, error) en el
+# hilo que lo consume, a medida que cada término termina, para que la
+# interfaz pueda mostrar el progreso sin tocar Streamlit desde otros hilos.
+def procesar_en_pipeline(terminos, buscar, generar, workers_busqueda=4, workers_generacion=4,
+                         limite_busqueda=None, limite_generacion=None, tam_cola=8):
+    terminos = list(terminos)
+    if not terminos:
+        return
+
+    pendientes = queue.Queue()
+    busquedas = queue.Queue(maxsize=max(1, tam_cola))
+    completados = queue.Queue()
+    detener = threading.Event()
+
+    for indice, termino in enumerate(terminos):
+        pendientes.put((indice, termino))
+
+    def poner(cola, elemento):
+        # Evita bloquear para siempre si el consumidor abandona el generador
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def etapa_busqueda():
+        while not detener.is_set():
+            try:
+                indice, termino = pendientes.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if limite_busqueda:
+                    limite_busqueda.adquirir()
+                busqueda = buscar(termino)
+            except Exception as e:
+                completados.put((indice, termino, None, e))
+                continue
+            if not poner(busquedas, (indice, termino, busqueda)):
+                return
+
+    def etapa_generacion():
+        while not detener.is_set():
+            try:
+                elemento = busquedas.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if elemento is _FIN:
+                return
+            indice, termino, busqueda = elemento
+            try:
+                if limite_generacion:
+                    limite_generacion.adquirir()
+                completados.put((indice, termino, generar(termino, busqueda), None))
+            except Exception as e:
+                completados.put((indice, termino, None, e))
+
+    hilos_busqueda = [threading.Thread(target=etapa_busqueda, daemon=True)
+                      for _ in range(max(1, min(workers_busqueda, len(terminos))))]
+    hilos_generacion = [threading.Thread(target=etapa_generacion, daemon=True)
+                        for _ in range(max(1, min(workers_generacion, len(terminos))))]
+    for hilo in hilos_busqueda + hilos_generacion:
+        hilo.start()
+
+    def cerrar_generacion():
+        for hilo in hilos_busqueda:
+            hilo.join()
+        for _ in hilos_generacion:
+            poner(busquedas, _FIN)
+
+    threading.Thread(target=cerrar_generacion, daemon=True).start()
+
+    try:
+        for _ in range(len(terminos)):
+            yield completados.get()
+    finally:
+        detener.set()
+
+
+_FALLIDO = object()
+_ENTREGADO = object()
+
+
+# Los elementos de un lote son términos o pares (termino, autor)
+def _partes(elemento):
+    return elemento if isinstance(elemento, tuple) else (elemento,)
+
+
+# Genera las entradas de `terminos` con `procesar_en_pipeline` y devuelve
+# (entradas, fallidos): la lista ordenada de (termino, definicion, fuentes) y
+# un diccionario termino -> error.
+#
+# Con `reanudar`, los términos ya presentes en el índice o completados en el
+# diario no se vuelven a generar; sin él se empieza un diario nuevo y se
+# regenera todo. Cada término terminado se registra de inmediato en el diario
+# y en el índice. `al_progresar(completados, total, termino, error)` se llama
+# desde el hilo que invoca esta función.
+#
+# Si se indica `al_entrada(termino, definicion, fuentes)`, las entradas se
+# entregan en el orden de `terminos` en cuanto están disponibles (sólo se
+# retienen las que terminan antes que alguna anterior) y no se acumulan:
+# `entradas` se devuelve vacía.
+def generar_lote(terminos, buscar, generar, diario=None, indice=None, coleccion=None, reanudar=True,
+                 al_progresar=None, al_entrada=None, **opciones_pipeline):
+    terminos = list(terminos)
+    resultados = [None] * len(terminos)
+    fallidos = {}
+    siguiente = 0
+
+    def entregar():
+        nonlocal siguiente
+        while al_entrada and siguiente < len(terminos) and resultados[siguiente] is not None:
+            if resultados[siguiente] is not _FALLIDO:
+                al_entrada(terminos[siguiente], *resultados[siguiente])
+                resultados[siguiente] = _ENTREGADO
+            siguiente += 1
+
+    if diario is not None and not reanudar:
+        diario.reiniciar()
+    if reanudar:
+        completados = diario.completados() if diario is not None else {}
+        for posicion, termino in enumerate(terminos):
+            if termino in completados:
+                resultados[posicion] = completados[termino]
+            elif indice is not None:
+                entrada = indice.obtener(coleccion, *_partes(termino))
+                if entrada:
+                    resultados[posicion] = (entrada["definicion"], entrada["fuentes"])
+
+    faltantes = [posicion for posicion, resultado in enumerate(resultados) if resultado is None]
+    entregar()
+    entradas = procesar_en_pipeline([terminos[posicion] for posicion in faltantes], buscar, generar, **opciones_pipeline)
+    for completados, (posicion, termino, resultado, error) in enumerate(entradas, start=1):
+        if error is None and indice is not None:
+            # Si el índice no se puede escribir (p. ej. sigue bloqueado por otro
+            # proceso), el término cuenta como fallido y se reintenta al reanudar
+            termino_indice, *autor = _partes(termino)
+            try:
+                indice.guardar(coleccion, termino_indice, *resultado, *autor)
+            except Exception as e:
+                error = e
+        if error is not None:
+            fallidos[termino] = error
+            resultados[faltantes[posicion]] = _FALLIDO
+            if diario is not None:
+                diario.registrar_fallo(termino, error)
+        else:
+            resultados[faltantes[posicion]] = resultado
+            if diario is not None:
+                diario.registrar_completado(termino, *resultado)
+        entregar()
+        if al_progresar:
+            al_progresar(completados, len(faltantes), termino, error)
+
+    # Conservar el orden original de los términos y saltar los que fallaron
+    entradas = [
+        (termino, *resultado) for termino, resultado in zip(terminos, resultados)
+        if resultado is not _FALLIDO and resultado is not _ENTREGADO
+    ]
+    return entradas, fallidos
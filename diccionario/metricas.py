@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Métricas de proceso de todas las etapas: conexión HTTP, espera por el límite
+# de concurrencia de cada proveedor (http_espera_limite, incluida en los tiempos
+# de búsqueda y de generación), solicitudes a cada proveedor, búsqueda, primer
+# token y generación del LLM, exportación de documentos, tokens y aciertos de
+# caché. Cada observación se emite también como una línea JSON en el logger
+# "diccionario.metricas" (con DICCIONARIO_LOG_METRICAS=1 se escribe en stderr),
+# se expone en formato de texto de Prometheus (con DICCIONARIO_METRICAS_PUERTO,
+# en http://host:puerto/metrics) y se muestra en el panel de depuración de las
+# aplicaciones (?depuracion=1).
+
+registro = logging.getLogger("diccionario.metricas")
+if os.environ.get("DICCIONARIO_LOG_METRICAS"):
+    registro.addHandler(logging.StreamHandler())
+    registro.setLevel(logging.INFO)
+
+PREFIJO = "diccionario_"
+
+# Límites (segundos) de las cubetas de los histogramas
+LIMITES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metricas:
+    def __init__(self, recientes=200):
+        self._contadores = {}
+        self._indicadores = {}
+        self._histogramas = {}
+        self._recientes = deque(maxlen=recientes)
+        self._lock = threading.Lock()
+
+    def contar(self, nombre, valor=1, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    # Valor actual de una magnitud que sube y baja (p. ej. el límite de concurrencia)
+    def fijar(self, nombre, valor, **etiquetas):
+        with self._lock:
+            self._indicadores[(nombre, tuple(sorted(etiquetas.items())))] = valor
+
+    # Registra una duración en segundos en el histograma `nombre`
+    def observar(self, nombre, segundos, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        evento = {"metrica": nombre, "segundos": round(segundos, 6), **etiquetas}
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = {"cubetas": [0] * len(LIMITES), "suma": 0.0, "cuenta": 0, "maximo": 0.0}
+            for i, limite in enumerate(LIMITES):
+                if segundos <= limite:
+                    histograma["cubetas"][i] += 1
+            histograma["suma"] += segundos
+            histograma["cuenta"] += 1
+            histograma["maximo"] = max(histograma["maximo"], segundos)
+            self._recientes.append({"hora": time.strftime("%H:%M:%S"), **evento})
+        registro.info(json.dumps(evento, ensure_ascii=False))
+
+    # Una fila por histograma y por contador, para el panel de depuración
+    def resumen(self):
+        with self._lock:
+            filas = [
+                {"métrica": nombre, **dict(etiquetas), "llamadas": h["cuenta"], "total_s": round(h["suma"], 3),
+                 "media_s": round(h["suma"] / h["cuenta"], 3), "máximo_s": round(h["maximo"], 3)}
+                for (nombre, etiquetas), h in sorted(self._histogramas.items())
+            ]
+            filas += [
+                {"métrica": nombre, **dict(etiquetas), "llamadas": valor}
+                for (nombre, etiquetas), valor in sorted(self._contadores.items())
+            ]
+            filas += [
+                {"métrica": nombre, **dict(etiquetas), "valor": valor}
+                for (nombre, etiquetas), valor in sorted(self._indicadores.items())
+            ]
+        return filas
+
+    def recientes(self):
+        with self._lock:
+            return list(reversed(self._recientes))
+
+    def prometheus(self):
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            indicadores = sorted(self._indicadores.items())
+            histogramas = sorted((clave, {**h, "cubetas": list(h["cubetas"])}) for clave, h in self._histogramas.items())
+        lineas = []
+        tipos = set()
+        for (nombre, etiquetas), valor in contadores:
+            metrica = f"{PREFIJO}{nombre}_total"
+            if metrica not in tipos:
+                tipos.add(metrica)
+                lineas.append(f"# TYPE {metrica} counter")
+            lineas.append(f"{metrica}{_etiquetas(etiquetas)} {valor}")
+        for (nombre, etiquetas), valor in indicadores:
+            metrica = f"{PREFIJO}{nombre}"
+            if metrica not in tipos:
+                tipos.add(metrica)
+                lineas.append(f"# TYPE {metrica} gauge")
+            lineas.append(f"{metrica}{_etiquetas(etiquetas)} {valor}")
+        for (nombre, etiquetas), h in histogramas:
+            metrica = f"{PREFIJO}{nombre}_segundos"
+            if metrica not in tipos:
+                tipos.add(metrica)
+                lineas.append(f"# TYPE {metrica} histogram")
+            for limite, cuenta in zip(LIMITES, h["cubetas"]):
+                lineas.append(f"{metrica}_bucket{_etiquetas(etiquetas, le=limite)} {cuenta}")
+            lineas.append(f"{metrica}_bucket{_etiquetas(etiquetas, le='+Inf')} {h['cuenta']}")
+            lineas.append(f"{metrica}_sum{_etiquetas(etiquetas)} {h['suma']}")
+            lineas.append(f"{metrica}_count{_etiquetas(etiquetas)} {h['cuenta']}")
+        return "\n".join(lineas) + "\n"
+
+    def reiniciar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._indicadores.clear()
+            self._histogramas.clear()
+            self._recientes.clear()
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(etiquetas, **extra):
+    pares = [*etiquetas, *extra.items()]
+    if not pares:
+        return ""
+    valores = ",".join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares)
+    return "{" + valores + "}"
+
+
+# Métricas compartidas por todo el proceso
+METRICAS = Metricas()
+contar = METRICAS.contar
+fijar = METRICAS.fijar
+observar = METRICAS.observar
+
+
+# Mide la duración del bloque; si lanza una excepción se cuenta también en `nombre`_errores
+@contextmanager
+def medir(nombre, **etiquetas):
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        contar(f"{nombre}_errores", **etiquetas)
+        raise
+    finally:
+        observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+
+_servidor = None
+_servidor_lock = threading.Lock()
+
+
+# Sirve METRICAS en /metrics desde un hilo en segundo plano (una vez por proceso)
+def servir(puerto, host="0.0.0.0"):
+    global _servidor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            cuerpo = METRICAS.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    with _servidor_lock:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, int(puerto)), Manejador)
+            threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
+        return _servidor
+
+
+def servir_desde_entorno():
+    puerto = os.environ.get("DICCIONARIO_METRICAS_PUERTO")
+    return servir(puerto) if puerto else None
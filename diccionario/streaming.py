@@ -0,0 +1,120 @@
+import json
+import threading
+
+from diccionario import metricas
+from diccionario.cache import clave_completado, guardar_completado, obtener_completado
+
+
+# Recorre una respuesta con server-sent events y produce el campo `data`
+# de cada evento hasta encontrar el marcador final "[DONE]".
+def leer_eventos_sse(response):
+    for linea in response.iter_lines(decode_unicode=True):
+        if not linea or not linea.startswith("data:"):
+            continue
+        datos = linea[len("data:"):].strip()
+        if datos == "[DONE]":
+            return
+        yield datos
+
+
+# Produce los fragmentos de texto de una respuesta de Together solicitada
+# con "stream_tokens": true.
+def tokens_together(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"Error en la API de Together: {response.status_code} - {response.text}")
+    for datos in leer_eventos_sse(response):
+        evento = json.loads(datos)
+        if "error" in evento:
+            raise RuntimeError(f"Error en la API de Together: {evento['error']}")
+        for opcion in evento.get("choices", []):
+            if opcion.get("text"):
+                yield opcion["text"]
+
+
+# Una transmisión del proveedor que pueden leer varias sesiones a la vez. Un
+# hilo consume el iterador y acumula los fragmentos; cada lector recibe todos
+# los fragmentos desde el principio conforme llegan, y la excepción del
+# proveedor si la hubo. El hilo termina la transmisión aunque los lectores la
+# abandonen, y entonces llama a al_terminar(texto, error).
+class _TransmisionCompartida:
+    def __init__(self, iterador, al_terminar):
+        self._fragmentos = []
+        self._terminada = False
+        self._error = None
+        self._condicion = threading.Condition()
+        threading.Thread(target=self._producir, args=(iterador, al_terminar), name="transmision", daemon=True).start()
+
+    def _producir(self, iterador, al_terminar):
+        try:
+            for fragmento in iterador:
+                with self._condicion:
+                    self._fragmentos.append(fragmento)
+                    self._condicion.notify_all()
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._condicion:
+                self._terminada = True
+                self._condicion.notify_all()
+        al_terminar("".join(self._fragmentos), self._error)
+
+    def leer(self):
+        leidos = 0
+        while True:
+            with self._condicion:
+                while leidos == len(self._fragmentos) and not self._terminada:
+                    self._condicion.wait()
+                nuevos = self._fragmentos[leidos:]
+                terminada = self._terminada
+            leidos += len(nuevos)
+            yield from nuevos
+            if terminada and leidos == len(self._fragmentos):
+                if self._error is not None:
+                    raise self._error
+                return
+
+
+_transmisiones = {}
+_transmisiones_lock = threading.Lock()
+
+
+# Lector de la transmisión en curso con la misma `clave` o de una nueva.
+# Al terminar (también con error) la clave se libera y la siguiente solicitud
+# vuelve a llamar al proveedor o lee la caché.
+def _leer_compartida(clave, transmitir, al_terminar):
+    def terminar(texto, error):
+        if error is None:
+            al_terminar(texto)
+        with _transmisiones_lock:
+            _transmisiones.pop(clave, None)
+
+    with _transmisiones_lock:
+        transmision = _transmisiones.get(clave)
+        if transmision is None:
+            transmision = _transmisiones[clave] = _TransmisionCompartida(transmitir(), terminar)
+        else:
+            metricas.contar("llamadas_agrupadas", tipo="transmision")
+    yield from transmision.leer()
+
+
+# Versión en streaming de `completar_con_cache`: si el completado ya está en
+# caché se entrega de una vez; si no, se transmite token a token y al terminar
+# se guarda el texto completo. `transmitir(parametros)` debe devolver un
+# iterador de fragmentos. Las solicitudes idénticas simultáneas (de cualquier
+# sesión) leen la misma transmisión en lugar de abrir otra.
+def transmitir_con_cache(parametros, transmitir, usar_cache=None):
+    if usar_cache is None:
+        usar_cache = parametros.get("temperature", 0) == 0
+    clave = clave_completado(parametros)
+    if usar_cache:
+        texto = obtener_completado(clave)
+        if texto is not None:
+            yield texto
+            return
+
+    def al_terminar(texto):
+        texto = texto.strip()
+        if usar_cache and texto:
+            guardar_completado(clave, texto)
+
+    yield from _leer_compartida(clave, lambda: transmitir(parametros), al_terminar)
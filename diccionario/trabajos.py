@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from diccionario import metricas
+
+# Hilos para trabajos en segundo plano del proceso (cada trabajo puede abrir los suyos)
+MAX_TRABAJOS_SIMULTANEOS = int(os.environ.get("DICCIONARIO_TRABAJOS_SIMULTANEOS", 8))
+
+
+# Trabajo en segundo plano: el estado, el texto parcial (generaciones en
+# streaming), el progreso y los avisos los escribe el hilo del trabajo y los
+# lee la interfaz en cada rerun.
+class Trabajo:
+    def __init__(self, descripcion="", clave=None):
+        self.id = uuid.uuid4().hex
+        self.descripcion = descripcion
+        self.clave = clave
+        self.estado = "pendiente"
+        self.resultado = None
+        self.error = None
+        self.parcial = ""
+        self.progreso = None
+        self.avisos = []
+        self.creado = time.time()
+        self.terminado_en = None
+        self._condicion = threading.Condition()
+
+    @property
+    def terminado(self):
+        return self.estado in ("terminado", "error")
+
+    def _actualizar(self, **cambios):
+        with self._condicion:
+            for nombre, valor in cambios.items():
+                setattr(self, nombre, valor)
+            self._condicion.notify_all()
+
+    def agregar_texto(self, fragmento):
+        with self._condicion:
+            self.parcial += fragmento
+            self._condicion.notify_all()
+
+    # (hechos, total, mensaje) para una barra de progreso
+    def informar(self, hechos, total, mensaje=""):
+        self._actualizar(progreso=(hechos, total, mensaje))
+
+    def avisar(self, mensaje):
+        with self._condicion:
+            self.avisos.append(mensaje)
+            self._condicion.notify_all()
+
+    # Espera a que el trabajo cambie o termine, como mucho `timeout` segundos
+    def esperar(self, timeout=None):
+        with self._condicion:
+            if not self.terminado:
+                self._condicion.wait(timeout)
+        return self.terminado
+
+
+# Registro de trabajos en segundo plano común a todas las sesiones de
+# Streamlit. `enviar(funcion, *args)` ejecuta funcion(trabajo, *args) en un
+# grupo de hilos y devuelve el `Trabajo` enseguida; los reruns y las
+# desconexiones del navegador no lo interrumpen, y el resultado se puede
+# recoger por su id mientras se conserve (`retencion` segundos tras terminar).
+class RegistroTrabajos:
+    def __init__(self, max_simultaneos=MAX_TRABAJOS_SIMULTANEOS, retencion=3600):
+        self.retencion = retencion
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=max_simultaneos, thread_name_prefix="trabajo")
+
+    # Con `clave`, si ya hay un trabajo sin terminar con esa clave (p. ej. el
+    # lote, que escribe siempre el mismo documento) se devuelve ese en lugar de
+    # empezar otro.
+    def enviar(self, funcion, *args, descripcion="", clave=None):
+        with self._lock:
+            self._purgar()
+            if clave is not None:
+                for trabajo in self._trabajos.values():
+                    if trabajo.clave == clave and not trabajo.terminado:
+                        return trabajo
+            trabajo = Trabajo(descripcion, clave)
+            self._trabajos[trabajo.id] = trabajo
+        self._ejecutor.submit(self._ejecutar, trabajo, funcion, args)
+        return trabajo
+
+    def _ejecutar(self, trabajo, funcion, args):
+        trabajo._actualizar(estado="en_curso")
+        try:
+            with metricas.medir("trabajo"):
+                resultado = funcion(trabajo, *args)
+        except Exception as e:
+            trabajo._actualizar(estado="error", error=e, terminado_en=time.time())
+        else:
+            trabajo._actualizar(estado="terminado", resultado=resultado, terminado_en=time.time())
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self._trabajos.get(id_trabajo)
+
+    def _purgar(self):
+        limite = time.time() - self.retencion
+        for id_trabajo in [i for i, t in self._trabajos.items() if t.terminado and t.terminado_en < limite]:
+            del self._trabajos[id_trabajo]
+
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def obtener_registro():
+    global _registro
+    with _registro_lock:
+        if _registro is None:
+            _registro = RegistroTrabajos()
+        return _registro
@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+
+from diccionario import datos, metricas
+from diccionario.colecciones import COLECCIONES
+from diccionario.diario import DiarioLote
+from diccionario.exportadores import FORMATOS
+from diccionario.indice import obtener_indice
+
+
+# Ejecuta sin Streamlit el mismo lote búsqueda -> generación -> documento que el
+# botón "Generar todas las entradas en batch" de serplyall.py. Las claves de
+# API se leen de las variables de entorno SERPLY_API_KEY y TOGETHER_API_KEY
+# (y SERPER_API_KEY, opcional, para usar Serper como respaldo de la búsqueda).
+#
+# Con --coleccion autores, escuela_austriaca o refutaciones precalcula en el
+# índice las entradas de los términos predefinidos de app.py (cada término ×
+# cada autor), serply.py o refutaciones.py, sin documento; autores y
+# refutaciones buscan con Serper (SERPER_API_KEY) y usan Serply como respaldo.
+# Las colecciones están en diccionario/colecciones.py.
+#
+#   python generar_diccionario.py --terminos terminos.txt --salida diccionario.docx
+#   python generar_diccionario.py --coleccion autores
+def leer_terminos(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return [linea.strip() for linea in archivo if linea.strip() and not linea.startswith("#")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el Diccionario Económico Austríaco en modo batch.")
+    parser.add_argument("--coleccion", choices=list(COLECCIONES), default="extendida",
+                        help="colección que se genera (por defecto, la extendida de serplyall.py, con documento)")
+    parser.add_argument("--terminos", help="archivo con un término por línea (por defecto, la lista predefinida)")
+    parser.add_argument("--salida", help="ruta del documento generado (sólo colección extendida; por defecto, Diccionario_Economico_Austriaco_Batch.docx)")
+    parser.add_argument("--formato", choices=list(FORMATOS),
+                        help="formato del documento (por defecto, según la extensión de --salida; sólo colección extendida)")
+    parser.add_argument("--workers-busqueda", type=int, default=16, help="máximo de términos en la etapa de búsqueda")
+    parser.add_argument("--workers-generacion", type=int, default=16, help="máximo de términos en la etapa de generación")
+    parser.add_argument("--busqueda-rps", "--serply-rps", type=float,
+                        help="cuota fija de solicitudes por segundo al buscador principal (por defecto, concurrencia adaptativa)")
+    parser.add_argument("--generacion-rps", "--together-rps", type=float,
+                        help="cuota fija de solicitudes por segundo a Together (por defecto, concurrencia adaptativa)")
+    parser.add_argument("--percentil-cobertura", type=float, default=95,
+                        help="percentil de latencia del buscador principal a partir del cual se cubre la búsqueda con el de respaldo (0 = sólo failover)")
+    parser.add_argument("--diario", help="diario de puntos de control (JSONL; por defecto, uno por colección)")
+    parser.add_argument("--reanudar", action=argparse.BooleanOptionalAction, default=True,
+                        help="reanudar desde el último punto de control (--no-reanudar regenera todo)")
+    parser.add_argument("--metricas", help="archivo donde guardar al terminar las métricas del lote en formato de Prometheus")
+    args = parser.parse_args(argv)
+
+    clase = COLECCIONES[args.coleccion]
+    # Proveedor de búsqueda principal de la colección; el otro es el de respaldo
+    busqueda = f"{clase.BUSCADOR.PROVEEDOR.upper()}_API_KEY"
+    respaldo = f"{clase.RESPALDO.PROVEEDOR.upper()}_API_KEY"
+    together_api_key = os.environ.get("TOGETHER_API_KEY")
+    if not os.environ.get(busqueda) or not together_api_key:
+        parser.error(f"Definir las variables de entorno {busqueda} y TOGETHER_API_KEY")
+    salida = args.salida or clase.DOCUMENTO
+    if salida and clase.DOCUMENTO is None:
+        parser.error(f"La colección {args.coleccion} no genera documento; se guarda sólo en el índice")
+
+    metricas.servir_desde_entorno()
+
+    def al_progresar(completados, total, termino, error):
+        estado = f"ERROR: {error}" if error is not None else "ok"
+        nombre = " × ".join(termino) if isinstance(termino, tuple) else termino
+        print(f"[{completados}/{total}] {nombre}: {estado}", file=sys.stderr, flush=True)
+
+    lote = clase(os.environ[busqueda], together_api_key, os.environ.get(respaldo), args.percentil_cobertura)
+    terminos = None
+    if args.terminos:
+        terminos = leer_terminos(args.terminos)
+        if args.coleccion == "autores":
+            terminos = [(termino, autor) for termino in terminos for autor in datos.AUTORES_AUSTRIACOS]
+    opciones = dict(
+        diario=DiarioLote(args.diario or lote.ruta_diario()), indice=obtener_indice(), reanudar=args.reanudar,
+        al_progresar=al_progresar, workers_busqueda=args.workers_busqueda, workers_generacion=args.workers_generacion,
+        busqueda_rps=args.busqueda_rps, generacion_rps=args.generacion_rps
+    )
+    if salida:
+        # Cada entrada se escribe en el documento en cuanto termina, en el orden de la lista
+        escritas, fallidos = lote.exportar(salida, terminos, formato=args.formato, **opciones)
+        print(f"{escritas} entradas guardadas en {salida}", file=sys.stderr)
+    else:
+        # Las entradas sólo se guardan en el índice, que es lo que sirven las aplicaciones
+        _, fallidos = lote.generar(terminos, **opciones)
+        print(f"Colección {clase.COLECCION} guardada en el índice", file=sys.stderr)
+    if args.metricas:
+        with open(args.metricas, "w", encoding="utf-8") as archivo:
+            archivo.write(metricas.METRICAS.prometheus())
+    if fallidos:
+        nombres = [" × ".join(termino) if isinstance(termino, tuple) else termino for termino in fallidos]
+        print(f"{len(fallidos)} términos fallaron; vuelve a ejecutar para reintentarlos: {', '.join(nombres)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
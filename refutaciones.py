@@ -1,35 +1,15 @@
 import streamlit as st
-import requests
-import json
-from docx import Document
-from io import BytesIO
+from diccionario import datos
+from diccionario.colecciones import ColeccionRefutaciones
+from diccionario.indice import obtener_indice
+from diccionario.interfaz import aplicacion_glosario, boton_descarga, elegir_termino, enviar_trabajo, panel_depuracion, pedir_termino, recoger_trabajo
 
 # Configuración de la página
 st.set_page_config(page_title="Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas", page_icon="📚", layout="wide")
 
 # Función para crear la columna de información
 def crear_columna_info():
-    st.markdown("""
-    ## Sobre esta aplicación
-
-    Esta aplicación es un Diccionario de Términos Socialistas y Marxistas con Refutaciones desde una perspectiva filosófica y general. Permite a los usuarios obtener definiciones de términos económicos socialistas o marxistas y sus correspondientes críticas desde un punto de vista amplio y fundamentado.
-
-    ### Cómo usar la aplicación:
-
-    1. Elige un término o tesis socialista/marxista de la lista predefinida o propón tu propio término.
-    2. Haz clic en "Obtener definición y refutación" para generar el contenido.
-    3. Lee la definición y la refutación filosófica proporcionada.
-    4. Si lo deseas, descarga un documento DOCX con toda la información.
-
-    ### Autor y actualización:
-    **Moris Polanco**, [Fecha actual]
-
-    ### Cómo citar esta aplicación (formato APA):
-    Polanco, M. ([Año actual]). *Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas* [Aplicación web]. [URL de la aplicación]
-
-    ---
-    **Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones y refutaciones basadas en información disponible en línea. Siempre verifica la información con fuentes académicas para un análisis más profundo.
-    """)
+    st.markdown(datos.INFO_REFUTACIONES)
 
 # Título de la aplicación
 st.title("Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas")
@@ -46,154 +26,177 @@ with col2:
     # Acceder a las claves de API de los secretos de Streamlit
     TOGETHER_API_KEY = st.secrets["TOGETHER_API_KEY"]
     SERPER_API_KEY = st.secrets["SERPER_API_KEY"]
+    # Proveedor de respaldo opcional y percentil de latencia a partir del cual se cubre la búsqueda (0 = sólo failover)
+    SERPLY_API_KEY = st.secrets.get("SERPLY_API_KEY")
+    PERCENTIL_COBERTURA = float(st.secrets.get("PERCENTIL_COBERTURA", 95))
+    # Mostrar el contenido a medida que se genera
+    STREAMING = bool(st.secrets.get("STREAMING", True))
+    # Colección del índice precalculado con las definiciones y refutaciones
+    COLECCION = ColeccionRefutaciones.COLECCION
+
+    # Lista de términos y tesis socialistas/marxistas (diccionario/datos.py)
+    terminos_socialistas = datos.TERMINOS_SOCIALISTAS
+
+    # Misma búsqueda y generación que generar_diccionario.py --coleccion refutaciones
+    lote = ColeccionRefutaciones(SERPER_API_KEY, TOGETHER_API_KEY, SERPLY_API_KEY, PERCENTIL_COBERTURA)
+    buscador, llm, generar_definicion_y_refutacion = lote.buscador, lote.llm, lote.generar_definicion_y_refutacion
+
+    # Escribe el contenido en `doc`, un escritor de cualquier formato de diccionario.exportadores
+    def escribir_documento(doc, termino, definicion, refutacion, fuentes):
+        doc.add_heading('Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas', 0)
 
-    # Lista de términos y tesis socialistas/marxistas
-    terminos_socialistas = [
-        "Lucha de clases", "Plusvalía", "Alienación", "Materialismo histórico", "Dictadura del proletariado",
-        "Modo de producción", "Socialismo científico", "Revolución proletaria", "Conciencia de clase",
-        "Imperialismo", "Capital constante y variable", "Fetichismo de la mercancía", "Acumulación primitiva",
-        "Ejército industrial de reserva", "Superestructura e infraestructura", "Socialización de los medios de producción",
-        "Teoría del valor-trabajo", "Contradicciones del capitalismo", "Comunismo primitivo",
-        "Internacionalismo proletario", "Determinismo económico", "Dialéctica materialista",
-        "Explotación laboral", "Pauperización", "Concentración del capital"
-    ]
-
-    def buscar_informacion(query):
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": f"{query} socialismo marxismo"
-        })
-        headers = {
-            'X-API-KEY': SERPER_API_KEY,
-            'Content-Type': 'application/json'
-        }
-        response = requests.post(url, headers=headers, data=payload)
-        if response.status_code != 200:
-            st.error(f"Error en la búsqueda: {response.status_code} - {response.text}")
-            return None
-        return response.json()
-
-    def generar_definicion_y_refutacion(termino, contexto):
-        url = "https://api.together.xyz/inference"
-        payload = json.dumps({
-            "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-            "prompt": f"""Contexto: {contexto}
-
-Término: {termino}
-
-1. Proporciona una definición concisa pero informativa del término o tesis socialista/marxista '{termino}', similar a una entrada de diccionario.
-
-2. Luego, proporciona una refutación o crítica amplia y fundamentada desde un punto de vista general o filosófico. Esta refutación debe:
-   - Abordar los principios fundamentales y las implicaciones filosóficas del concepto.
-   - Considerar aspectos éticos, políticos y sociales más allá de lo puramente económico.
-   - Presentar argumentos lógicos y ejemplos históricos o teóricos relevantes.
-   - Explorar las posibles contradicciones o debilidades en la teoría.
-   - Ofrecer perspectivas alternativas de diferentes escuelas de pensamiento.
-
-La refutación debe ser equilibrada, académica y basada en un análisis crítico profundo.
-
-Definición:
-
-Refutación filosófica:""",
-            "max_tokens": 2048,
-            "temperature": 0,
-            "top_p": 0.7,
-            "top_k": 50,
-            "repetition_penalty": 0,
-            "stop": ["Término:"]
-        })
-        headers = {
-            'Authorization': f'Bearer {TOGETHER_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-        response = requests.post(url, headers=headers, data=payload)
-
-        if response.status_code != 200:
-            st.error(f"Error en la API de Together: {response.status_code} - {response.text}")
-            return None
+        def disponer(doc):
+            doc.add_heading('Término', level=1)
+            doc.add_paragraph(termino)
+
+            doc.add_heading('Definición', level=2)
+            doc.add_paragraph(definicion)
+
+            doc.add_heading('Refutación Filosófica', level=2)
+            doc.add_paragraph(refutacion)
+
+            doc.add_heading('Fuentes', level=1)
+            for fuente in fuentes:
+                doc.add_paragraph(fuente, style='List Bullet')
+
+        doc.add_entry({"termino": termino, "definicion": definicion, "refutacion": refutacion, "fuentes": fuentes}, disponer)
+
+        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
 
+    def mostrar_contenido(termino, definicion, refutacion, fuentes):
+        st.subheader(f"Término: {termino}")
+        st.markdown("**Definición:**")
+        st.write(definicion)
+        st.markdown("**Refutación filosófica:**")
+        st.write(refutacion)
+
+        # Botón para descargar el documento
+        boton_descarga("Descargar contenido", f"Definicion_y_Refutacion_{termino}", escribir_documento, termino, definicion, refutacion, fuentes)
+
+    # Trabajo en segundo plano: busca, genera la definición y la refutación (en
+    # streaming el texto se acumula en el trabajo conforme llega) y guarda el
+    # contenido en el índice. Devuelve (termino, contenido, fuentes).
+    def generar_contenido(trabajo, termino, predefinido):
+        # Buscar información relevante
         try:
-            return response.json()['output']['choices'][0]['text'].strip()
-        except KeyError as e:
-            st.error(f"Error al procesar la respuesta de la API de Together: {e}")
-            st.json(response.json())  # Muestra la respuesta completa para debug
-            return None
-
-    def create_docx(termino, definicion, refutacion, fuentes):
-        doc = Document()
-        doc.add_heading('Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas', 0)
+            resultado = buscador.buscar(termino)
+        except RuntimeError as e:
+            raise RuntimeError(f"{e}\n\nNo se pudo obtener información relevante. Por favor, intenta de nuevo.") from e
+        contexto = resultado.contexto(termino)
+
+        # Generar definición y refutación
+        if STREAMING:
+            for fragmento in generar_definicion_y_refutacion(termino, contexto, stream=True):
+                trabajo.agregar_texto(fragmento)
+            contenido = trabajo.parcial.strip()
+        else:
+            contenido = generar_definicion_y_refutacion(termino, contexto)
+
+        if not contenido:
+            raise RuntimeError("No se pudo generar el contenido. Por favor, intenta de nuevo.")
+        if predefinido:
+            obtener_indice().guardar(COLECCION, termino, contenido, resultado.fuentes)
+        return termino, contenido, resultado.fuentes
+
+    def mostrar_progreso(trabajo):
+        st.subheader(f"Término: {trabajo.descripcion}")
+        st.markdown(trabajo.parcial or "Buscando información y generando contenido...")
+
+    # Divide el contenido en definición y refutación y lo conserva entre reruns
+    # (p. ej. al pulsar el botón de descarga)
+    def guardar_contenido(termino, contenido, fuentes):
+        partes = contenido.split("Refutación filosófica:")
+        if len(partes) == 2:
+            definicion, refutacion = partes
+        else:
+            st.error("No se pudo separar la definición de la refutación.")
+            st.text(contenido)  # Mostrar el contenido completo para debug
+            definicion = contenido
+            refutacion = "No se pudo generar una refutación."
+        st.session_state["ultimo_contenido"] = (termino, definicion.strip(), refutacion.strip(), fuentes)
 
-        doc.add_heading('Término', level=1)
-        doc.add_paragraph(termino)
+    # Modo glosario: las instrucciones comunes se envían una vez por grupo de
+    # términos. Las refutaciones son largas, así que los grupos son más pequeños.
+    INSTRUCCIONES_GLOSARIO = """Eres un redactor de un diccionario de términos socialistas y marxistas con refutaciones filosóficas. Para cada término o tesis:
 
-        doc.add_heading('Definición', level=2)
-        doc.add_paragraph(definicion)
+1. Proporciona una definición concisa pero informativa, similar a una entrada de diccionario.
 
-        doc.add_heading('Refutación Filosófica', level=2)
-        doc.add_paragraph(refutacion)
+2. Luego, proporciona una refutación o crítica fundamentada desde un punto de vista general o filosófico, que aborde los principios fundamentales del concepto, considere aspectos éticos, políticos y sociales, y señale sus posibles contradicciones o debilidades.
 
-        doc.add_heading('Fuentes', level=1)
-        for fuente in fuentes:
-            doc.add_paragraph(fuente, style='List Bullet')
+La refutación debe ser equilibrada, académica y basada en un análisis crítico."""
+    CAMPOS_GLOSARIO = {"definicion": "definición del término", "refutacion": "refutación filosófica"}
 
-        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
+    def generar_entrada_glosario(termino, contexto):
+        return separar_contenido(generar_definicion_y_refutacion(termino, contexto))
 
-        return doc
+    # El índice guarda la definición y la refutación en un solo texto, como el modo de un término
+    def componer_contenido(entrada):
+        return f"{entrada['definicion']}\n\nRefutación filosófica: {entrada['refutacion']}"
 
-    # Interfaz de usuario
-    st.write("Elige un término o tesis socialista/marxista de la lista o propón tu propio término:")
+    def separar_contenido(contenido):
+        definicion, _, refutacion = contenido.partition("Refutación filosófica:")
+        return {"definicion": definicion.strip(), "refutacion": refutacion.strip() or "No se pudo generar una refutación."}
+
+    def mostrar_glosario(entradas):
+        for termino, entrada, _ in entradas:
+            st.subheader(termino)
+            st.markdown(f"**Definición:** {entrada['definicion']}")
+            st.markdown(f"**Refutación filosófica:** {entrada['refutacion']}")
 
-    opcion = st.radio("", ["Elegir de la lista", "Proponer mi propio término"])
+    # Escribe el glosario en `doc` con las fuentes de cada término
+    def escribir_glosario(doc, entradas):
+        doc.add_heading('Diccionario de Términos Socialistas y Marxistas con Refutaciones Filosóficas', 0)
+
+        def disponer(doc, termino, entrada, fuentes):
+            doc.add_heading(termino, level=1)
+            doc.add_heading('Definición', level=2)
+            doc.add_paragraph(entrada["definicion"])
+            doc.add_heading('Refutación Filosófica', level=2)
+            doc.add_paragraph(entrada["refutacion"])
+            if fuentes:
+                doc.add_heading('Fuentes', level=2)
+                for fuente in fuentes:
+                    doc.add_paragraph(fuente, style='List Bullet')
+
+        for termino, entrada, fuentes in entradas:
+            doc.add_entry({"termino": termino, **entrada, "fuentes": fuentes},
+                          lambda doc: disponer(doc, termino, entrada, fuentes))
+
+        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
 
-    if opcion == "Elegir de la lista":
-        termino = st.selectbox("Selecciona un término:", terminos_socialistas)
+    # Interfaz de usuario
+    modo = st.radio("Modo:", ["Un término", "Varios términos (glosario)"], horizontal=True)
+    if modo == "Varios términos (glosario)":
+        aplicacion_glosario(
+            terminos_socialistas, COLECCION, buscador, llm, INSTRUCCIONES_GLOSARIO, CAMPOS_GLOSARIO,
+            generar_entrada_glosario, mostrar_glosario, escribir_glosario, componer_contenido, separar_contenido,
+            "Términos o tesis propios (uno por línea):", tamano_grupo=3, tokens_por_entrada=900
+        )
     else:
-        termino = st.text_input("Ingresa tu propio término o tesis socialista/marxista:")
-
-    if st.button("Obtener definición y refutación"):
-        if termino:
-            with st.spinner("Buscando información y generando contenido..."):
-                # Buscar información relevante
-                resultados_busqueda = buscar_informacion(termino)
-                if resultados_busqueda:
-                    contexto = "\n".join([item["snippet"] for item in resultados_busqueda.get("organic", []) if "snippet" in item])
-                    fuentes = [item["link"] for item in resultados_busqueda.get("organic", [])]
-
-                    # Generar definición y refutación
-                    contenido = generar_definicion_y_refutacion(termino, contexto)
-
-                    if contenido:
-                        # Dividir el contenido en definición y refutación
-                        partes = contenido.split("Refutación filosófica:")
-                        if len(partes) == 2:
-                            definicion, refutacion = partes
-                        else:
-                            st.error("No se pudo separar la definición de la refutación.")
-                            st.text(contenido)  # Mostrar el contenido completo para debug
-                            definicion = contenido
-                            refutacion = "No se pudo generar una refutación."
-
-                        # Mostrar el contenido
-                        st.subheader(f"Término: {termino}")
-                        st.markdown("**Definición:**")
-                        st.write(definicion.strip())
-                        st.markdown("**Refutación filosófica:**")
-                        st.write(refutacion.strip())
-
-                        # Botón para descargar el documento
-                        doc = create_docx(termino, definicion.strip(), refutacion.strip(), fuentes)
-                        buffer = BytesIO()
-                        doc.save(buffer)
-                        buffer.seek(0)
-                        st.download_button(
-                            label="Descargar contenido en DOCX",
-                            data=buffer,
-                            file_name=f"Definicion_y_Refutacion_{termino.replace(' ', '_')}.docx",
-                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                        )
-                    else:
-                        st.error("No se pudo generar el contenido. Por favor, intenta de nuevo.")
-                else:
-                    st.error("No se pudo obtener información relevante. Por favor, intenta de nuevo.")
-        else:
-            st.warning("Por favor, selecciona o ingresa un término.")
+        st.write("Elige un término o tesis socialista/marxista de la lista o propón tu propio término:")
+
+        termino, predefinido, sugerir_similares = elegir_termino(terminos_socialistas, "Ingresa tu propio término o tesis socialista/marxista:")
+
+        pedido = pedir_termino("Obtener definición y refutación", COLECCION, termino, predefinido, sugerir_similares)
+        if pedido:
+            termino, predefinido = pedido
+            # Las entradas que ya están en el índice (p. ej. las precalculadas) se sirven sin llamar a las APIs
+            entrada = obtener_indice().obtener(COLECCION, termino)
+            if entrada:
+                guardar_contenido(termino, entrada["definicion"], entrada["fuentes"])
+            else:
+                # La generación sigue en segundo plano aunque haya reruns o se recargue la página
+                enviar_trabajo("trabajo_contenido", generar_contenido, termino, predefinido, descripcion=termino)
+
+        trabajo = recoger_trabajo("trabajo_contenido", mostrar_progreso)
+        if trabajo is not None:
+            if trabajo.error is not None:
+                st.error(str(trabajo.error))
+            else:
+                guardar_contenido(*trabajo.resultado)
+
+        if "ultimo_contenido" in st.session_state:
+            mostrar_contenido(*st.session_state["ultimo_contenido"])
+
+# Panel de depuración (oculto salvo con ?depuracion=1)
+panel_depuracion()
@@ -1,36 +1,18 @@
 import streamlit as st
-import requests
-import json
-from docx import Document
-from io import BytesIO
-from time import sleep
+import os
+from diccionario import datos
+from diccionario.colecciones import ColeccionExtendida
+from diccionario.diario import DiarioLote
+from diccionario.exportadores import FORMATOS
+from diccionario.indice import obtener_indice
+from diccionario.interfaz import enviar_trabajo, panel_depuracion, recoger_trabajo
 
 # Set page configuration
 st.set_page_config(page_title="Diccionario Económico Austríaco", page_icon="📚", layout="wide")
 
 # Function to create the information column
 def crear_columna_info():
-    st.markdown("""
-    ## Sobre esta aplicación
-
-    Esta aplicación es un Diccionario Económico basado en la perspectiva de la Escuela Austríaca de Economía. Permite a los usuarios obtener definiciones de términos económicos según esta interpretación.
-
-    ### Cómo usar la aplicación:
-
-    1. Elija un término económico de la lista predefinida o ingrese su propio término.
-    2. Haga clic en "Generar entrada de diccionario" para obtener la definición desde la perspectiva de la escuela austríaca.
-    3. Lea la definición y las fuentes proporcionadas.
-    4. Si lo desea, descargue un documento DOCX con toda la información.
-
-    ### Autor y actualización:
-    **Moris Polanco**, 28 ag 2024
-
-    ### Cómo citar esta aplicación (formato APA):
-    Polanco, M. (2024). *Diccionario Económico Austríaco* [Aplicación web]. https://economiaaustriaca.streamlit.app
-
-    ---
-    **Nota:** Esta aplicación utiliza inteligencia artificial para generar definiciones basadas en la visión de la escuela austríaca. Verifique la información con fuentes adicionales para un análisis más profundo.
-    """)
+    st.markdown(datos.INFO_LOTE)
 
 # Titles and Main Column
 st.title("Diccionario Económico Austríaco")
@@ -43,123 +25,88 @@ with col1:
 with col2:
     TOGETHER_API_KEY = st.secrets["TOGETHER_API_KEY"]
     SERPLY_API_KEY = st.secrets["SERPLY_API_KEY"]
-
-    # 101 economic terms related to the Austrian school of economics
-    terminos_economicos = sorted([
-        "Acción Humana", "Ahorro", "Aranceles", "Armonía Económica", "Avería", "Banco Central",
-        "Bienes de Capital", "Bienes Intermedios", "Bienes de Consumo", "Capitalismo", "Competencia",
-        "Competencia Monopolística", "Competencia Perfecta", "Conocimiento", "Costo de Oportunidad",
-        "Crédito", "Crecimiento Económico", "Ciclo Económico", "Deflación", "Demanda", "División del Trabajo",
-        "Doble Coincidencia de Deseos", "Eficiencia", "Elasticidad", "Emprendimiento", "Equilibrio Económico",
-        "Especialización", "Espontaneidad", "Esperanza de Vida", "Estado de Derecho", "Externalidades",
-        "Factor de Producción", "Federalismo", "Fiduciario", "Función Empresarial", "Futuro", "Gasto Público",
-        "Inflación", "Instituciones", "Interés", "Inversión", "Intervencionismo", "Libre Mercado",
-        "Mecanismo de Precios", "Mercado", "Microeconomía", "Modelo de Competencia", "Moneda",
-        "Monopolio", "Oferta", "Orden Espontáneo", "Paradigma", "Pareto", "Plusvalía", "Poder Adquisitivo",
-        "Política Económica", "Ponderación", "Precio", "Preferencia de Tiempo", "Preferencias", "Producción",
-        "Productividad", "Propiedad Privada", "Proteccionismo", "Racionalidad", "Recurso Económico",
-        "Redistribución de la Riqueza", "Regulación", "Renta", "Riesgo", "Sector Público", "Sector Privado",
-        "Seguridad Jurídica", "Servicio", "Sistema Económico", "Soberanía del Consumidor", "Sociedad Abierta",
-        "Subsidio", "Sujeto Económico", "Tasa de Interés", "Teoría del Ciclo Económico", "Trabajo", "Valor",
-        "Valor de Uso", "Valor del Cambio", "Ventaja Competitiva", "Ventaja Comparativa", "Verosimilitud",
-        "Voluntad Individual", "Bienes Públicos", "Economía de Escala", "Heterogénea del Capital",
-        "Cálculo Económico", "Teoría del Capital", "Preferencia Temporal", "Productividad Marginal",
-        "Interés Natural", "Subsidiaridad", "Humano Acción", "Reconstrucción"
-
-    ])
-
-    def buscar_informacion(query):
-        url = f"https://api.serply.io/v1/scholar/q={query}"
-        headers = {
-            'X-Api-Key': SERPLY_API_KEY,
-            'Content-Type': 'application/json',
-            'X-Proxy-Location': 'US',
-            'X-User-Agent': 'Mozilla/5.0'
-        }
-        response = requests.get(url, headers=headers)
-        return response.json()
-
-    def generar_definicion(termino, contexto):
-        url = "https://api.together.xyz/inference"
-        payload = json.dumps({
-            "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-            "prompt": f"Contexto: {contexto}\n\nTérmino: {termino}\n\nProporciona una definición del término económico '{termino}' según la visión de la escuela austríaca de economía. La definición debe ser más larga, detallada, e informativa, similar a una entrada de diccionario extendida. Incluye referencias a fuentes específicas que traten este concepto.\n\nDefinición:",
-            "max_tokens": 2048,
-            "temperature": 0.7,
-            "top_p": 0.7,
-            "top_k": 50,
-            "repetition_penalty": 1,
-            "stop": ["Término:"]
-        })
-        headers = {
-            'Authorization': f'Bearer {TOGETHER_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-        response = requests.post(url, headers=headers, data=payload)
-        return response.json()['output']['choices'][0]['text'].strip()
-
-    def create_docx(terminos_definiciones_fuentes):
-        doc = Document()
-        doc.add_heading('Diccionario Económico - Escuela Austríaca', 0)
-
-        for termino, definicion, fuentes in terminos_definiciones_fuentes:
-            doc.add_heading('Término', level=1)
-            doc.add_paragraph(termino)
-            doc.add_heading('Definición', level=2)
-            doc.add_paragraph(definicion)
-            if fuentes:
-                doc.add_heading('Fuentes', level=3)
-                for fuente in fuentes:
-                    doc.add_paragraph(f"{fuente['author']}. ({fuente['year']}). *{fuente['title']}*. {fuente['journal']}, {fuente['volume']}({fuente['issue']}), {fuente['pages']}. {fuente['url']}", style='List Bullet')
-            doc.add_page_break()
-
-        doc.add_paragraph('\nNota: Este documento fue generado por un asistente de IA. Verifica la información con fuentes académicas para un análisis más profundo.')
-
-        return doc
-
-    def generar_todas_las_entradas():
-        terminos_definiciones_fuentes = []
-
-        for termino in terminos_economicos:
-            st.write(f"Procesando término: {termino}")
-            # Buscar información relevante
-            resultados_busqueda = buscar_informacion(termino)
-            if resultados_busqueda is None:
-                continue  # Saltar este término si hubo un error en la búsqueda
-            contexto = "\n".join([item["snippet"] for item in resultados_busqueda.get("results", [])])
-            fuentes = [{
-                "author": item["author"] if "author" in item else "Autor desconocido",
-                "year": item["year"] if "year" in item else "s.f.",
-                "title": item["title"],
-                "journal": item["journal"] if "journal" in item else "Revista desconocida",
-                "volume": item["volume"] if "volume" in item else "",
-                "issue": item["issue"] if "issue" in item else "",
-                "pages": item["pages"] if "pages" in item else "",
-                "url": item["url"]
-            } for item in resultados_busqueda.get("results", [])]
-
-            # Generar definición
-            definicion = generar_definicion(termino, contexto)
-
-            # Añadir a la lista de resultados
-            terminos_definiciones_fuentes.append((termino, definicion, fuentes))
-            sleep(1)  # Añadir un pequeño retraso para no sobrecargar el servidor
-
-        # Crear y guardar el archivo DOCX
-        doc = create_docx(terminos_definiciones_fuentes)
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer
+    # Proveedor de respaldo opcional y percentil de latencia a partir del cual se cubre la búsqueda (0 = sólo failover)
+    SERPER_API_KEY = st.secrets.get("SERPER_API_KEY")
+    PERCENTIL_COBERTURA = float(st.secrets.get("PERCENTIL_COBERTURA", 95))
+    # Cuotas fijas opcionales de cada proveedor (solicitudes por segundo; sin ellas la
+    # concurrencia se adapta a las respuestas del proveedor) y tamaño de los grupos de hilos
+    SERPLY_RPS = float(st.secrets.get("SERPLY_RPS", 0)) or None
+    TOGETHER_RPS = float(st.secrets.get("TOGETHER_RPS", 0)) or None
+    WORKERS_BUSQUEDA = int(st.secrets.get("WORKERS_BUSQUEDA", 16))
+    WORKERS_GENERACION = int(st.secrets.get("WORKERS_GENERACION", 16))
+    # La búsqueda, la generación y el documento son los mismos que usa generar_diccionario.py
+    lote = ColeccionExtendida(SERPLY_API_KEY, TOGETHER_API_KEY, SERPER_API_KEY, PERCENTIL_COBERTURA)
+
+    # Diario de puntos de control del lote
+    RUTA_DIARIO = st.secrets.get("DIARIO_LOTE", lote.ruta_diario())
+    # Documento generado por el último lote
+    RUTA_DOCX = st.secrets.get("DOCX_LOTE", os.path.join(os.path.dirname(RUTA_DIARIO), lote.DOCUMENTO))
+
+    # Ruta del documento del lote en el formato elegido (misma base que DOCX_LOTE)
+    def ruta_documento(formato):
+        return os.path.splitext(RUTA_DOCX)[0] + FORMATOS[formato]["extension"]
+
+    # Trabajo en segundo plano: el lote sigue aunque haya reruns o se cierre la
+    # página, y el progreso y los fallos se guardan en el trabajo. Devuelve los términos fallidos.
+    def generar_todas_las_entradas(trabajo, formato="docx", reanudar=True):
+        def al_progresar(completados, total, termino, error):
+            if error is not None:
+                trabajo.avisar(f"No se pudo procesar el término {termino}: {error}")
+            trabajo.informar(completados, total, f"Procesado: {termino}")
+
+        # Las búsquedas y las generaciones se solapan; cada proveedor tiene su propio límite de tasa.
+        # Cada término terminado queda registrado en el diario y en el índice, y se escribe
+        # en el documento en disco sin mantener el documento completo en memoria.
+        ruta = ruta_documento(formato)
+        temporal = ruta + ".tmp"
+        _, fallidos = lote.exportar(
+            temporal, formato=formato, diario=DiarioLote(RUTA_DIARIO), indice=obtener_indice(), reanudar=reanudar,
+            al_progresar=al_progresar, workers_busqueda=WORKERS_BUSQUEDA, workers_generacion=WORKERS_GENERACION,
+            busqueda_rps=SERPLY_RPS, generacion_rps=TOGETHER_RPS
+        )
+        os.replace(temporal, ruta)
+        return fallidos
+
+    def mostrar_progreso(trabajo):
+        completados, total, mensaje = trabajo.progreso or (0, 0, "Procesando términos...")
+        st.progress(completados / total if total else 0.0, text=mensaje)
+        for aviso in trabajo.avisos:
+            st.write(aviso)
 
     # UI para generación en batch
+    formato = st.selectbox("Formato del documento:", list(FORMATOS), format_func=lambda f: FORMATOS[f]["nombre"])
+    reanudar = st.checkbox("Reanudar desde el último punto de control", value=True)
     if st.button("Generar todas las entradas en batch"):
-        with st.spinner("Generando todas las entradas del diccionario..."):
-            doc_buffer = generar_todas_las_entradas()
-            if doc_buffer:
-                st.download_button(
-                    label="Descargar todas las definiciones en DOCX",
-                    data=doc_buffer,
-                    file_name="Diccionario_Economico_Austriaco_Batch.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
+        # Todas las sesiones comparten el diario, así que si ya hay un lote en curso se sigue ese
+        enviar_trabajo("trabajo_lote", generar_todas_las_entradas, formato, reanudar,
+                       descripcion="Lote completo", clave_trabajo=("lote", RUTA_DIARIO))
+
+    trabajo = recoger_trabajo("trabajo_lote", mostrar_progreso)
+    if trabajo is not None:
+        for aviso in trabajo.avisos:
+            st.write(aviso)
+        if trabajo.error is not None:
+            st.error(str(trabajo.error))
+        else:
+            st.progress(1.0, text="Términos procesados")
+            if trabajo.resultado:
+                st.warning(f"{len(trabajo.resultado)} términos fallaron. Vuelve a ejecutar el lote para reintentar sólo esos términos.")
+
+    # El documento se lee del disco sólo cuando el usuario pulsa el botón, no en
+    # cada rerun, y la descarga no provoca un rerun
+    ruta = ruta_documento(formato)
+    if os.path.exists(ruta):
+        def leer_documento():
+            with open(ruta, "rb") as archivo:
+                return archivo.read()
+
+        st.download_button(
+            label=f"Descargar todas las definiciones en {FORMATOS[formato]['nombre']}",
+            data=leer_documento,
+            file_name=f"Diccionario_Economico_Austriaco_Batch{FORMATOS[formato]['extension']}",
+            mime=FORMATOS[formato]["mime"],
+            on_click="ignore"
+        )
+
+# Panel de depuración (oculto salvo con ?depuracion=1)
+panel_depuracion()